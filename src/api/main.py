@@ -1,23 +1,94 @@
 """FastAPI application."""
+import asyncio
+import atexit
 import logging
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from src.api.schemas import SearchResponse, MatchResult, HealthResponse, RegisterResponse
 from src.services.face_service import FaceService
 from src.utils.config_loader import load_config, get_config
+from src.utils.db import close_pools
 from src.exceptions import NoFaceDetectedError, MultipleFacesError
 
-logging.basicConfig(level=logging.INFO)
+# Handlers run on a listener thread so log I/O never blocks the event loop
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    handlers=[QueueHandler(_log_queue)]
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 load_config()
 cfg = get_config()
 
+# Config is immutable after load, so per-request settings are bound once
+MAX_UPLOAD_BYTES = cfg.get("files", {}).get("max_size_mb", 10) * 1024 * 1024
+ALLOWED_DIRS = cfg.get("storage", {}).get("allowed_directories", [])
+REGISTER_CONCURRENCY = cfg.get("api", {}).get("register_concurrency", 4)
+
+service = FaceService()
+
+# Bounded pool for blocking DeepFace calls so inference never runs on the event loop
+executor = ThreadPoolExecutor(
+    max_workers=cfg.get("api", {}).get("workers", 4),
+    thread_name_prefix="face-worker"
+)
+
+# Separate pool for /register batches, so registration can never take every
+# face-worker thread and starve /search
+register_executor = ThreadPoolExecutor(
+    max_workers=REGISTER_CONCURRENCY,
+    thread_name_prefix="register-worker"
+)
+
+
+async def run_blocking(func, *args, pool: ThreadPoolExecutor = executor):
+    """Run a blocking service call in a worker pool (face-worker by default)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, func, *args)
+
+
+def warm_schemas() -> None:
+    """Build response validators/serializers before the first request."""
+    SearchResponse(
+        success=True,
+        matches=[MatchResult(image_path="", confidence=0.0, distance=0.0)]
+    ).model_dump_json()
+    HealthResponse().model_dump_json()
+    RegisterResponse(success=True).model_dump_json()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm schemas and models before serving; close DB pools on shutdown."""
+    warm_schemas()
+    if cfg.get("api", {}).get("warmup", True):
+        try:
+            await run_blocking(service.warmup)
+        except Exception:
+            logger.exception("Model warmup failed")
+    yield
+    close_pools()
+
+
 app = FastAPI(
     title="Event Face Detection API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurable CORS
@@ -29,20 +100,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-service = FaceService()
+# Match lists repeat long path prefixes and compress well
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=cfg.get("api", {}).get("gzip_min_size", 1024)
+)
+
+
+def resolve_allowed_parts(allowed_dirs: list[str]) -> frozenset[tuple[str, ...]]:
+    """Resolve allowed directories once into path component tuples."""
+    return frozenset(Path(d).resolve().parts for d in allowed_dirs)
+
+
+ALLOWED_PARTS = resolve_allowed_parts(ALLOWED_DIRS)
 
 
-def validate_path(path: str, allowed_dirs: list[str]) -> bool:
+def validate_path(
+    path: str,
+    allowed_parts: frozenset[tuple[str, ...]] = ALLOWED_PARTS
+) -> bool:
     """Validate path is within allowed directories (prevent path traversal)."""
-    resolved = Path(path).resolve()
-    for allowed in allowed_dirs:
-        allowed_resolved = Path(allowed).resolve()
-        try:
-            resolved.relative_to(allowed_resolved)
-            return True
-        except ValueError:
-            continue
-    return False
+    parts = Path(path).resolve().parts
+    return any(parts[:len(allowed)] == allowed for allowed in allowed_parts)
+
+
+async def read_upload(file: UploadFile, max_size: int) -> bytes:
+    """Read upload in chunks, aborting as soon as it exceeds max_size."""
+    buf = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > max_size:
+            raise HTTPException(413, f"File too large (max {max_size // (1024*1024)}MB)")
+    return bytes(buf)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -51,6 +140,15 @@ async def health():
     return HealthResponse()
 
 
+@app.get("/stats")
+async def stats():
+    """Cache statistics."""
+    return {
+        "embedding_cache": service.embedding_cache.stats(),
+        "result_cache": service.result_cache.stats()
+    }
+
+
 @app.post("/search", response_model=SearchResponse)
 async def search(
     file: UploadFile = File(...),
@@ -63,36 +161,35 @@ async def search(
         raise HTTPException(400, "File must be an image")
 
     # Read with size limit
-    max_size = cfg.get("files", {}).get("max_size_mb", 10) * 1024 * 1024
-    content = await file.read(max_size + 1)
-    if len(content) > max_size:
-        raise HTTPException(413, f"File too large (max {max_size // (1024*1024)}MB)")
+    content = await read_upload(file, MAX_UPLOAD_BYTES)
 
     try:
-        matches = service.search(content, limit=limit)
-        logger.info(f"Search returned {len(matches)} matches")
-        return SearchResponse(
+        matches = await run_blocking(service.search, content, limit)
+        logger.info("Search returned %d matches", len(matches))
+        # Service returns typed str/float fields, so skip per-item validation
+        return SearchResponse.model_construct(
             success=True,
             matches=[
-                MatchResult(
+                MatchResult.model_construct(
                     image_path=m.image_path,
                     confidence=m.confidence,
                     distance=m.distance
                 )
                 for m in matches
-            ]
+            ],
+            error=None
         )
 
     except NoFaceDetectedError as e:
-        logger.warning(f"No face detected: {e}")
+        logger.warning("No face detected: %s", e)
         return SearchResponse(success=False, error=str(e))
 
     except MultipleFacesError as e:
-        logger.warning(f"Multiple faces: {e}")
+        logger.warning("Multiple faces: %s", e)
         return SearchResponse(success=False, error=str(e))
 
-    except Exception as e:
-        logger.error(f"Search failed: {e}")
+    except Exception:
+        logger.exception("Search failed")
         return SearchResponse(success=False, error="Search failed. Please try again.")
 
 
@@ -101,27 +198,44 @@ async def register(photos_dir: str | None = None):
     """Register event photos to database."""
     # Validate path if provided
     if photos_dir:
-        allowed_dirs = cfg.get("storage", {}).get("allowed_directories", [])
-        if not validate_path(photos_dir, allowed_dirs):
-            logger.warning(f"Path traversal attempt: {photos_dir}")
+        if not validate_path(photos_dir):
+            logger.warning("Path traversal attempt: %s", photos_dir)
             raise HTTPException(403, "Access to directory not allowed")
 
     try:
-        count = service.register_event_photos(photos_dir)
-        logger.info(f"Registered {count} photos from {photos_dir or 'default'}")
+        base_dir, photos = await run_blocking(service.list_event_photos, photos_dir)
+        # register_executor bounds concurrency across all /register calls
+        count = sum(await asyncio.gather(*(
+            run_blocking(service.register_photo_batch, batch, base_dir, pool=register_executor)
+            for batch in service.batch_photos(photos)
+        )))
+        logger.info("Registered %d photos from %s", count, photos_dir or "default")
         return RegisterResponse(
             success=True,
             count=count,
             message=f"Registered {count} photos"
         )
-    except Exception as e:
-        logger.error(f"Registration failed: {e}")
+    except Exception:
+        logger.exception("Registration failed")
         return RegisterResponse(success=False, message="Registration failed. Check logs.")
 
 
 @app.post("/build")
 async def build():
     """Trigger representation building."""
-    count = service.build_representations()
-    logger.info(f"Built representations for {count} photos")
+    count = await run_blocking(service.build_representations)
+    logger.info("Built representations for %d photos", count)
     return {"message": f"Built representations for {count} photos"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=cfg.get("api", {}).get("host", "0.0.0.0"),
+        port=int(cfg.get("api", {}).get("port", 8000)),
+        # uvloop/httptools ship with uvicorn[standard]; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
@@ -1,9 +1,11 @@
 """Pydantic schemas for API."""
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class MatchResult(BaseModel):
     """Single match result."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     image_path: str
     confidence: float
     distance: float
@@ -11,6 +13,8 @@ class MatchResult(BaseModel):
 
 class SearchResponse(BaseModel):
     """Response for search endpoint."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     success: bool
     matches: list[MatchResult] = []
     error: str | None = None
@@ -18,12 +22,16 @@ class SearchResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     """Response for health endpoint."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     status: str = "ok"
     version: str = "1.0.0"
 
 
 class RegisterResponse(BaseModel):
     """Response for register endpoint."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     success: bool
     count: int = 0
     message: str = ""
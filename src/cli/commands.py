@@ -1,22 +1,51 @@
 """CLI commands for face detection."""
+import os
 import click
 import subprocess
 import platform
+import yaml
 from pathlib import Path
 
 from src.services.face_service import FaceService
-from src.utils.config_loader import load_config
+from src.utils.config_loader import load_config, get_config
 from src.exceptions import NoFaceDetectedError, MultipleFacesError
 
+_SYSTEM = platform.system()
+# Opener command per platform; None means os.startfile (Windows)
+_OPENER_CMD = {"Darwin": "open", "Windows": None}.get(_SYSTEM, "xdg-open")
+
 
 def open_path(path: str) -> None:
     """Open file or folder using system default app."""
-    if platform.system() == "Darwin":
-        subprocess.run(["open", path], check=False)
-    elif platform.system() == "Windows":
-        subprocess.run(["explorer", path], check=False)
+    open_paths([path])
+
+
+def open_paths(paths: list[str]) -> None:
+    """Open several files with the system default app, batching where supported."""
+    if not paths:
+        return
+    if _OPENER_CMD is None:
+        # startfile raises for a missing file or one with no associated app
+        for path in paths:
+            try:
+                os.startfile(path)
+            except OSError as e:
+                click.echo(f"Could not open {path}: {e}", err=True)
+    elif _OPENER_CMD == "open":
+        # macOS `open` accepts many files: one process spawn for all of them
+        subprocess.run([_OPENER_CMD, *paths], check=False)
     else:
-        subprocess.run(["xdg-open", path], check=False)
+        # xdg-open takes a single argument
+        for path in paths:
+            subprocess.run([_OPENER_CMD, path], check=False)
+
+
+def get_service() -> FaceService:
+    """Return the FaceService shared by commands of the current CLI invocation."""
+    obj = click.get_current_context().ensure_object(dict)
+    if "service" not in obj:
+        obj["service"] = FaceService()
+    return obj["service"]
 
 
 @click.group()
@@ -29,7 +58,7 @@ def cli():
 @click.option("--photos", default=None, help="Event photos directory")
 def register(photos: str | None):
     """Register event photos to database."""
-    service = FaceService()
+    service = get_service()
     target = photos or service.db_path
 
     click.echo(f"Registering photos from: {target}")
@@ -41,7 +70,7 @@ def register(photos: str | None):
 @click.option("--db-path", default=None, help="Event photos directory")
 def build(db_path: str | None):
     """Pre-build face representations for event photos."""
-    service = FaceService()
+    service = get_service()
     if db_path:
         service.db_path = db_path
 
@@ -74,7 +103,7 @@ def _search_single_image(
         for i, m in enumerate(matches, 1):
             relative_path = m.image_path
             full_path = service.resolve_image_path(relative_path)
-            filename = Path(relative_path).name
+            filename = os.path.basename(relative_path)
             click.echo(f"{i}. {filename}")
             click.echo(f"   Relative: {relative_path}")
             click.echo(f"   Full path: {full_path}")
@@ -83,10 +112,8 @@ def _search_single_image(
 
         if open_results and matches:
             click.echo("Opening matched images...")
-            for m in matches:
-                full_path = service.resolve_image_path(m.image_path)
-                if Path(full_path).exists():
-                    open_path(full_path)
+            paths = [service.resolve_image_path(m.image_path) for m in matches]
+            open_paths([p for p in paths if os.path.exists(p)])
 
     except NoFaceDetectedError as e:
         click.echo(f"Error: {e}", err=True)
@@ -113,6 +140,9 @@ def _search_person_folder(
     click.echo(f"References used: {result.reference_count}")
     click.echo(f"Unique matches: {len(result.matches)}")
 
+    for note in result.notes:
+        click.echo(note)
+
     if result.search_errors:
         click.echo(f"\nWarnings ({len(result.search_errors)}):")
         for err in result.search_errors[:5]:
@@ -127,6 +157,8 @@ def _search_person_folder(
     output = service.copy_matches_to_output(result)
 
     click.echo(f"\nCopied {output.copied_count} images to:")
+    if output.linked_count:
+        click.echo(f"  ({output.linked_count} hard-linked to the originals)")
     click.echo(f"  {output.output_path}")
 
     if output.skipped_files:
@@ -151,7 +183,7 @@ def search(image_path: str, limit: int, db_path: str | None, open_results: bool,
     Accepts single image file OR folder with multiple reference photos.
     When folder provided, extracts person name and copies matches to output.
     """
-    service = FaceService()
+    service = get_service()
     if db_path:
         service.set_photos_base_dir(db_path)
 
@@ -168,7 +200,7 @@ def search(image_path: str, limit: int, db_path: str | None, open_results: bool,
 @click.option("--yes", "-y", is_flag=True, help="Skip confirmation prompt")
 def clear(yes: bool):
     """Clear all registered images from database."""
-    service = FaceService()
+    service = get_service()
 
     if not yes:
         click.confirm("Delete all registered face embeddings?", abort=True)
@@ -180,8 +212,6 @@ def clear(yes: bool):
 @cli.command()
 def config():
     """Show current configuration."""
-    from src.utils.config_loader import get_config
-    import yaml
     click.echo(yaml.dump(get_config(), default_flow_style=False))
 
 
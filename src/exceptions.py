@@ -7,8 +7,10 @@ class FaceDetectionError(Exception):
 
 
 class NoFaceDetectedError(FaceDetectionError):
+    MESSAGE = "No face detected. Please upload image with clear face."
+
     def __init__(self):
-        super().__init__("No face detected. Please upload image with clear face.")
+        super().__init__(self.MESSAGE)
 
 
 class MultipleFacesError(FaceDetectionError):
@@ -1,10 +1,19 @@
 """Debug utilities for face detection analysis."""
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from deepface import DeepFace
 
 from src.exceptions import NoFaceDetectedError, MultipleFacesError
+from src.utils.cache import content_key
 from src.utils.config_loader import get_config
-from src.utils.image_utils import preprocess_image, save_temp, save_face_debug_image, save_match_debug_image
-from src.services.face_service import SearchMatch, find_matching_face_in_image
+from src.utils.db import pooled_connection
+from src.utils.image_utils import (
+    decode_image, image_info, preprocess_image, save_face_debug_image, save_match_debug_image
+)
+from src.services.face_service import SearchMatch, find_matching_face_in_image, shared_embedding_cache
+
+# Matched images annotated concurrently in debug step [10]
+MATCH_DEBUG_WORKERS = 4
 
 
 class FaceDebugService:
@@ -36,136 +45,143 @@ class FaceDebugService:
 
     def search_with_debug(self, query_image: bytes, limit: int = 10, source_path: str = "") -> list[SearchMatch]:
         """Search with detailed debug output showing face detection steps."""
-        from PIL import Image
-        import io
-        import os
-
         print(f"\n[1] INPUT IMAGE ANALYSIS")
         print(f"    Source: {source_path}")
         print(f"    Size: {len(query_image):,} bytes")
-        original_img = Image.open(io.BytesIO(query_image))
-        print(f"    Original dimensions: {original_img.size[0]}x{original_img.size[1]}, Mode: {original_img.mode}")
+        width, height, mode = image_info(query_image)
+        print(f"    Original dimensions: {width}x{height}, Mode: {mode}")
 
         print(f"\n[2] PREPROCESSING")
         processed = preprocess_image(query_image)
-        processed_img = Image.open(io.BytesIO(processed))
-        print(f"    Processed: {processed_img.size[0]}x{processed_img.size[1]}, {len(processed):,} bytes")
-
-        temp_path = save_temp(processed)
-        print(f"    Temp file: {temp_path}")
-
-        try:
-            print(f"\n[3] FACE DETECTION (detector: {self.detector})")
-            faces = DeepFace.extract_faces(img_path=str(temp_path), detector_backend=self.detector, enforce_detection=False)
-            print(f"    Faces detected: {len(faces)}")
-            for i, face in enumerate(faces):
-                r = face.get("facial_area", {})
-                print(f"    Face {i+1}: x={r.get('x',0)}, y={r.get('y',0)}, w={r.get('w',0)}, h={r.get('h',0)}, conf={face.get('confidence',0):.4f}")
-
-            # Save debug image with face bounding boxes
-            if faces:
-                debug_img_path = save_face_debug_image(processed, faces)
-                print(f"    Debug image: {debug_img_path}")
-
-            if len(faces) == 0:
-                print("    WARNING: No face detected!")
-                raise NoFaceDetectedError()
-            if len(faces) > 1:
-                raise MultipleFacesError(len(faces))
-
-            # Get query embedding for later use in finding matching face
+        width, height, _ = image_info(processed)
+        print(f"    Processed: {width}x{height}, {len(processed):,} bytes")
+
+        # Decode once; DeepFace takes the BGR array directly, no temp file re-reads
+        img = decode_image(processed)
+
+        print(f"\n[3] FACE DETECTION (detector: {self.detector})")
+        faces = DeepFace.extract_faces(img_path=img, detector_backend=self.detector, enforce_detection=False)
+        print(f"    Faces detected: {len(faces)}")
+        for i, face in enumerate(faces):
+            r = face.get("facial_area", {})
+            print(f"    Face {i+1}: x={r.get('x',0)}, y={r.get('y',0)}, w={r.get('w',0)}, h={r.get('h',0)}, conf={face.get('confidence',0):.4f}")
+
+        # Save debug image with face bounding boxes
+        if faces:
+            debug_img_path = save_face_debug_image(processed, faces)
+            print(f"    Debug image: {debug_img_path}")
+
+        if len(faces) == 0:
+            print("    WARNING: No face detected!")
+            raise NoFaceDetectedError()
+        if len(faces) > 1:
+            raise MultipleFacesError(len(faces))
+
+        # Get query embedding for later use in finding matching face,
+        # reusing one cached by a regular search of the same image
+        cached = shared_embedding_cache().get((content_key(query_image), self.model, self.detector))
+        if cached is not None:
+            query_embedding = cached.tolist()
+            print("    Query embedding: cached")
+        else:
             query_rep = DeepFace.represent(
-                img_path=str(temp_path), model_name=self.model, detector_backend=self.detector,
+                img_path=img, model_name=self.model, detector_backend=self.detector,
                 enforce_detection=False
             )
             query_embedding = query_rep[0]["embedding"] if query_rep else None
 
-            print(f"\n[4] DATABASE CHECK")
-            db_count = self._count_embeddings()
-            print(f"    Total embeddings in DB: {db_count}")
-            if db_count == 0:
-                print("    WARNING: Database empty! Run 'python main.py register' first.")
-
-            print(f"\n[5] SEARCH PARAMETERS")
-            print(f"    Model: {self.model}, Detector: {self.detector}, Threshold: {self.threshold}, Limit: {limit}")
-
-            print(f"\n[6] EXECUTING SEARCH...")
-            results = DeepFace.search(
-                img=str(temp_path), model_name=self.model, detector_backend=self.detector,
-                distance_metric="cosine", database_type="postgres",
-                connection_details=self._get_db_connection(), search_method="exact",
-                similarity_search=True, k=limit, enforce_detection=False
-            )
-
-            print(f"\n[7] RAW RESULTS - type: {type(results)}, count: {len(results)}")
-            matches, all_candidates = [], []
-            for df_idx, df in enumerate(results):
-                print(f"    Item {df_idx} type: {type(df)}")
-                if hasattr(df, 'iterrows'):
-                    print(f"    DataFrame {df_idx}: {len(df)} rows")
-                    for _, row in df.iterrows():
-                        dist = row.get("distance", 1.0)
-                        identity = row.get("identity", row.get("img_name", ""))
-                        all_candidates.append((identity, dist))
-                        if dist <= self.threshold:
-                            matches.append(SearchMatch(
-                                image_path=identity, distance=dist, confidence=max(0, 1 - dist)
-                            ))
-
-            print(f"\n[8] CANDIDATE ANALYSIS (threshold={self.threshold})")
-            if all_candidates:
-                print(f"    Total candidates: {len(all_candidates)}")
-                for i, (identity, dist) in enumerate(sorted(all_candidates, key=lambda x: x[1])[:10]):
-                    status = "MATCH" if dist <= self.threshold else "REJECT"
-                    # identity is now relative path from DB
-                    print(f"    {i+1}. [{status}] dist={dist:.4f} conf={max(0,1-dist):.2%} - {identity}")
-            else:
-                print("    No candidates from DeepFace.search()")
-
-            sorted_matches = sorted(matches, key=lambda x: x.distance)[:limit]
-            print(f"\n[9] FINAL MATCHES: {len(sorted_matches)}")
-            if not sorted_matches and all_candidates:
-                best_dist = min(c[1] for c in all_candidates)
-                print(f"    Best distance: {best_dist:.4f}, Threshold: {self.threshold}")
-                if best_dist > self.threshold:
-                    print(f"    HINT: Best candidate above threshold by {best_dist - self.threshold:.4f}")
-
-            # Save debug images for matched results
-            # Find the exact matching face by comparing embeddings
-            if sorted_matches and query_embedding:
-                print(f"\n[10] SAVING MATCH DEBUG IMAGES")
-                for i, match in enumerate(sorted_matches):
-                    try:
-                        # Resolve relative path to absolute for file access
-                        full_path = self.resolve_image_path(match.image_path)
-                        # Find the face that matches the query embedding
-                        matching_face = find_matching_face_in_image(
-                            query_embedding, full_path, self.model, self.detector
-                        )
-                        if matching_face and matching_face.get("facial_area"):
-                            debug_path = save_match_debug_image(
-                                full_path, [matching_face], match.confidence
-                            )
-                            print(f"    {i+1}. {debug_path}")
-                        else:
-                            print(f"    {i+1}. Skipped (no matching face found)")
-                    except Exception as e:
-                        print(f"    {i+1}. Failed: {e}")
-
-            print("=" * 60)
-            return sorted_matches
-        finally:
-            temp_path.unlink(missing_ok=True)
+        print(f"\n[4] DATABASE CHECK")
+        db_count = self._count_embeddings()
+        print(f"    Total embeddings in DB: {db_count}")
+        if db_count == 0:
+            print("    WARNING: Database empty! Run 'python main.py register' first.")
+
+        print(f"\n[5] SEARCH PARAMETERS")
+        print(f"    Model: {self.model}, Detector: {self.detector}, Threshold: {self.threshold}, Limit: {limit}")
+
+        print(f"\n[6] EXECUTING SEARCH...")
+        results = DeepFace.search(
+            img=img, model_name=self.model, detector_backend=self.detector,
+            distance_metric="cosine", database_type="postgres",
+            connection_details=self._get_db_connection(), search_method="exact",
+            similarity_search=True, k=limit, enforce_detection=False
+        )
+
+        print(f"\n[7] RAW RESULTS - type: {type(results)}, count: {len(results)}")
+        all_candidates = []
+        for df_idx, df in enumerate(results):
+            print(f"    Item {df_idx} type: {type(df)}")
+            if hasattr(df, 'iterrows'):
+                print(f"    DataFrame {df_idx}: {len(df)} rows")
+                # Whole columns at once instead of one Series per row
+                dists = df["distance"].to_numpy(dtype=float) if "distance" in df else np.ones(len(df))
+                id_col = "identity" if "identity" in df else "img_name"
+                identities = df[id_col].to_numpy() if id_col in df else np.full(len(df), "")
+                all_candidates.extend(zip(identities, dists))
+
+        print(f"\n[8] CANDIDATE ANALYSIS (threshold={self.threshold})")
+        candidate_dists = np.fromiter((c[1] for c in all_candidates), dtype=float, count=len(all_candidates))
+        if all_candidates:
+            print(f"    Total candidates: {len(all_candidates)}")
+            # Partition out the 10 closest, then sort only those
+            top = np.argpartition(candidate_dists, min(10, len(candidate_dists)) - 1)[:10]
+            top = top[np.argsort(candidate_dists[top])]
+            for i, (identity, dist) in enumerate(all_candidates[j] for j in top):
+                status = "MATCH" if dist <= self.threshold else "REJECT"
+                # identity is now relative path from DB
+                print(f"    {i+1}. [{status}] dist={dist:.4f} conf={max(0,1-dist):.2%} - {identity}")
+        else:
+            print("    No candidates from DeepFace.search()")
+
+        # Threshold, then partition out the `limit` closest; SearchMatch only for those
+        within = np.flatnonzero(candidate_dists <= self.threshold)
+        if limit < len(within):
+            within = within[np.argpartition(candidate_dists[within], limit)[:limit]]
+        within = within[np.argsort(candidate_dists[within], kind="stable")]
+        dists = candidate_dists[within]
+        sorted_matches = [
+            SearchMatch(image_path=all_candidates[j][0], distance=dist, confidence=conf)
+            for j, dist, conf in zip(within.tolist(), dists.tolist(), np.maximum(0.0, 1.0 - dists).tolist())
+        ]
+        print(f"\n[9] FINAL MATCHES: {len(sorted_matches)}")
+        if not sorted_matches and all_candidates:
+            best_dist = candidate_dists.min()
+            print(f"    Best distance: {best_dist:.4f}, Threshold: {self.threshold}")
+            if best_dist > self.threshold:
+                print(f"    HINT: Best candidate above threshold by {best_dist - self.threshold:.4f}")
+
+        # Save debug images for matched results
+        # Find the exact matching face by comparing embeddings
+        if sorted_matches and query_embedding:
+            print(f"\n[10] SAVING MATCH DEBUG IMAGES")
+
+            def save_one(match: SearchMatch) -> str:
+                try:
+                    # Resolve relative path to absolute for file access
+                    full_path = self.resolve_image_path(match.image_path)
+                    # Find the face that matches the query embedding
+                    matching_face = find_matching_face_in_image(
+                        query_embedding, full_path, self.model, self.detector
+                    )
+                    if matching_face and matching_face.get("facial_area"):
+                        return str(save_match_debug_image(full_path, [matching_face], match.confidence))
+                    return "Skipped (no matching face found)"
+                except Exception as e:
+                    return f"Failed: {e}"
+
+            # Each match needs its own detector pass; overlap them, print in rank order
+            with ThreadPoolExecutor(max_workers=MATCH_DEBUG_WORKERS) as pool:
+                for i, line in enumerate(pool.map(save_one, sorted_matches)):
+                    print(f"    {i+1}. {line}")
+
+        print("=" * 60)
+        return sorted_matches
 
     def _count_embeddings(self) -> int:
-        import psycopg2
         try:
-            conn = psycopg2.connect(**{k: self._get_db_connection()[k] for k in ['host', 'port', 'user', 'password', 'dbname']})
-            with conn.cursor() as cur:
+            with pooled_connection(self._get_db_connection(), self._db_cfg.get("pool_size", 8)) as conn, \
+                    conn.cursor() as cur:
                 cur.execute("SELECT COUNT(*) FROM embeddings")
                 return cur.fetchone()[0]
         except Exception:
             return -1
-        finally:
-            if 'conn' in locals():
-                conn.close()
@@ -1,15 +1,50 @@
 """Face detection and search service using DeepFace."""
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
 import numpy as np
 from deepface import DeepFace
 
 from src.exceptions import NoFaceDetectedError, MultipleFacesError
+from src.services.gallery import EmbeddingGallery
+from src.services.similarity import cosine_distances
+from src.utils.cache import EmbeddingStore, TTLCache, content_key, file_content_key
 from src.utils.config_loader import get_config
-from src.utils.image_utils import preprocess_image, save_temp
+from src.utils.db import pooled_connection
+from src.utils.file_utils import fast_copy
+from src.utils.image_utils import preprocess_to_array
 
+# References embedded between early-stop checks in search_person_folder
+EARLY_STOP_CHUNK = 4
 
-@dataclass
+_embedding_cache: TTLCache | None = None
+_embedding_cache_lock = threading.Lock()
+
+
+def shared_embedding_cache() -> TTLCache:
+    """Process-wide query embedding cache, sized from config on first use.
+
+    Keys include model and detector, so services with different settings
+    can share it; every FaceService, the API and person search hit one cache.
+    """
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            cfg = get_config()["deepface"]
+            _embedding_cache = TTLCache(
+                max_size=cfg.get("embedding_cache_size", 1024),
+                ttl_seconds=cfg.get("embedding_cache_ttl", 3600)
+            )
+        return _embedding_cache
+
+
+@dataclass(slots=True)
 class SearchMatch:
     """Represents a face search match result."""
     image_path: str
@@ -22,21 +57,26 @@ class SearchMatch:
     target_h: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonSearchResult:
     """Result from searching with multiple reference photos of one person."""
     person_name: str
     matches: list[SearchMatch]
-    reference_count: int
+    reference_count: int  # References processed; fewer than found after an early stop
     search_errors: list[str]
+    # Informational messages that are not errors, e.g. early stop
+    notes: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class OutputSummary:
     """Summary of copy operation for matched images."""
     copied_count: int
     output_path: str
     skipped_files: list[str]
+    # Of copied_count, files hard-linked to the source: they share its inode,
+    # so editing one in place also changes the original event photo
+    linked_count: int = 0
 
 
 def find_matching_face_in_image(
@@ -62,22 +102,14 @@ def find_matching_face_in_image(
     if not representations:
         return None
 
-    # Find the face with embedding closest to query
-    query_vec = np.array(query_embedding)
-    best_face = None
-    best_distance = float('inf')
-
-    for rep in representations:
-        rep_vec = np.array(rep.get("embedding", []))
-        if len(rep_vec) == 0:
-            continue
-        # Cosine distance
-        distance = 1 - np.dot(query_vec, rep_vec) / (np.linalg.norm(query_vec) * np.linalg.norm(rep_vec) + 1e-10)
-        if distance < best_distance:
-            best_distance = distance
-            best_face = {"facial_area": rep.get("facial_area", {})}
+    # Score every detected face against the query in one matrix-vector product
+    faces = [rep for rep in representations if len(rep.get("embedding", []))]
+    if not faces:
+        return None
 
-    return best_face
+    distances = cosine_distances(query_embedding, [rep["embedding"] for rep in faces])
+    best = int(np.argmin(distances))
+    return {"facial_area": faces[best].get("facial_area", {})}
 
 
 class FaceService:
@@ -89,27 +121,93 @@ class FaceService:
         self.detector = cfg["deepface"]["detector_backend"]
         self.threshold = cfg["deepface"]["threshold"]
         self.db_path = cfg["storage"]["event_photos"]
+        self.gallery_index = cfg["deepface"].get("index", "exact")
+        self.gallery_nprobe = cfg["deepface"].get("nprobe", 16)
+        self.gallery_check_interval = cfg["deepface"].get("gallery_check_interval", 1.0)
+        db = cfg.get("database", {})
+        self._conn_kwargs = {
+            "host": db.get("host", "localhost"),
+            "port": db.get("port", 5432),
+            "user": db.get("user", "deepface"),
+            "password": db.get("password", "deepface"),
+            "dbname": db.get("database", "deepface_db")
+        }
+        self._db_pool_size = db.get("pool_size", 8)
+        formats = cfg.get("files", {}).get("allowed_formats", ["jpeg", "jpg", "png", "heic"])
+        # One C-level match per file name instead of splitext + lower + set lookup;
+        # the leading "." skips dot-files like ".jpg", as splitext did
+        self._image_name = re.compile(
+            r".\.(?:%s)\Z" % "|".join(re.escape(fmt) for fmt in formats), re.IGNORECASE
+        )
+        # Default: half the cores, leaving room for the model's own intra-op threads
+        self.register_workers = (
+            cfg["deepface"].get("register_workers") or max(1, (os.cpu_count() or 2) // 2)
+        )
+        self.register_batch_size = cfg["deepface"].get("register_batch_size", 32)
+        self.register_prefilter = cfg["deepface"].get("register_prefilter")
+        self.embedding_cache = shared_embedding_cache()
+        # Search results depend on the gallery, so they are cached per service
+        # and dropped together with it
+        self.result_cache = TTLCache(
+            max_size=cfg["deepface"].get("result_cache_size", 2000),
+            ttl_seconds=cfg["deepface"].get("result_cache_ttl", 600)
+        )
         # Base directory for resolving relative image paths from DB
         self._photos_base_dir: str | None = None
+        # Registered embeddings cached in memory; reloaded when the embeddings
+        # table changes (including register/clear from other processes)
+        self._gallery: EmbeddingGallery | None = None
+        self._gallery_lock = threading.Lock()
+        self._gallery_generation_seen: tuple | None = None
+        self._gallery_checked_at = float("-inf")
+        self._warm = False
+        self._warmup_lock = threading.Lock()
+        self._allowed_roots_cache: tuple[list[str], tuple[str, ...]] | None = None
+        # Reference embeddings persisted across runs (opened on first use)
+        store_path = cfg.get("person_search", {}).get("embedding_store")
+        self.reference_store = EmbeddingStore(store_path) if store_path else None
+
+    def warmup(self) -> None:
+        """Load recognition and detector models into DeepFace's model cache.
+
+        Idempotent and thread-safe; call once per process after any fork.
+        """
+        with self._warmup_lock:
+            if self._warm:
+                return
+            DeepFace.build_model(model_name=self.model, task="facial_recognition")
+            # "skip" uses no detector model, so there is nothing to load
+            if self.detector != "skip":
+                DeepFace.build_model(model_name=self.detector, task="face_detector")
+            self._warm = True
 
     def set_photos_base_dir(self, base_dir: str) -> None:
         """Set base directory for resolving relative image paths."""
-        self._photos_base_dir = str(Path(base_dir).resolve())
+        self._photos_base_dir = os.path.realpath(base_dir)
 
     def resolve_image_path(self, relative_path: str) -> str:
         """Convert relative DB path to absolute path for file operations."""
-        if Path(relative_path).is_absolute():
+        if os.path.isabs(relative_path):
             return relative_path  # Already absolute (legacy data)
-        base = self._photos_base_dir or self.db_path
-        return str(Path(base) / relative_path)
+        return os.path.join(self._photos_base_dir or self.db_path, relative_path)
+
+    def _detected(self, faces: list[dict], confidence_key: str = "confidence") -> list[dict]:
+        """Drop the whole-image placeholder DeepFace returns when no face is found.
 
-    def validate_single_face(self, image_path: str) -> dict:
-        """Ensure exactly one face in image."""
-        faces = DeepFace.extract_faces(
+        With enforce_detection=False a face-less image comes back as one region
+        with confidence 0; the "skip" backend reports 0 for every image.
+        """
+        if self.detector == "skip":
+            return faces
+        return [f for f in faces if f.get(confidence_key, 0) > 0]
+
+    def validate_single_face(self, image_path: str | np.ndarray) -> dict:
+        """Ensure exactly one face in image (path or decoded BGR array)."""
+        faces = self._detected(DeepFace.extract_faces(
             img_path=image_path,
             detector_backend=self.detector,
             enforce_detection=False
-        )
+        ))
 
         if len(faces) == 0:
             raise NoFaceDetectedError()
@@ -119,56 +217,241 @@ class FaceService:
         return faces[0]
 
     def _get_db_connection(self) -> dict:
-        """Get PostgreSQL connection details from config."""
-        cfg = get_config()
-        db = cfg.get("database", {})
-        return {
-            "host": db.get("host", "localhost"),
-            "port": db.get("port", 5432),
-            "user": db.get("user", "deepface"),
-            "password": db.get("password", "deepface"),
-            "dbname": db.get("database", "deepface_db")
-        }
+        """Get PostgreSQL connection details resolved from config at init."""
+        return self._conn_kwargs
 
-    def search(self, query_image: bytes, limit: int = 10) -> list[SearchMatch]:
-        """Search for matching faces using DeepFace.search() with PostgreSQL."""
-        processed = preprocess_image(query_image)
-        temp_path = save_temp(processed)
+    def _connection(self):
+        """Borrow a pooled psycopg2 connection (context manager)."""
+        return pooled_connection(self._conn_kwargs, self._db_pool_size)
 
-        try:
-            self.validate_single_face(str(temp_path))
+    def embedding_key(self, digest: bytes) -> tuple[bytes, str, str]:
+        """Cache key for an image digest under this service's model and detector."""
+        return digest, self.model, self.detector
+
+    def embed(self, query_image: bytes) -> np.ndarray:
+        """Return the face embedding of a single-face query image, cached by content.
+
+        Raises:
+            NoFaceDetectedError: If no face found
+            MultipleFacesError: If more than one face found
+        """
+        key = self.embedding_key(content_key(query_image))
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            embedding = self._compute_embedding(query_image)
+            self.embedding_cache.put(key, embedding)
+        return embedding
 
-            # Use DeepFace.search with similarity_search=True to get all results
-            # Then apply our own threshold from config (DeepFace default is too strict)
-            results = DeepFace.search(
-                img=str(temp_path),
+    def embed_files(self, paths: list[os.PathLike], workers: int = 4) -> list[np.ndarray | Exception]:
+        """Embed several single-face photos, running the model once for the whole batch.
+
+        Cached photos are served from embedding_cache, then reference_store;
+        the rest are decoded on `workers` threads and sent through one batched
+        DeepFace.represent call, and persisted to reference_store.
+
+        Returns:
+            Per path, its embedding or the exception it raised
+            (NoFaceDetectedError, MultipleFacesError, OSError, ...)
+        """
+        results: list[np.ndarray | Exception | None] = [None] * len(paths)
+        keys: dict[int, tuple] = {}
+        for i, path in enumerate(paths):
+            try:
+                key = self.embedding_key(file_content_key(path))
+            except OSError as e:
+                results[i] = e
+                continue
+            results[i] = self.embedding_cache.get(key)
+            if results[i] is None:
+                keys[i] = key
+        if keys and self.reference_store is not None:
+            stored = self.reference_store.get_many(list(keys.values()))
+            for i, key in list(keys.items()):
+                if key in stored:
+                    results[i] = stored[key]
+                    self.embedding_cache.put(key, stored[key])
+                    del keys[i]
+        if not keys:
+            return results
+
+        def load(i: int) -> np.ndarray | Exception:
+            try:
+                with open(paths[i], "rb") as f:
+                    return preprocess_to_array(f.read())
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(keys)))) as pool:
+            arrays = dict(zip(keys, pool.map(load, keys)))
+        pending = []
+        for i, arr in arrays.items():
+            if isinstance(arr, Exception):
+                results[i] = arr
+            else:
+                pending.append(i)
+
+        try:
+            batch = DeepFace.represent(
+                img_path=[arrays[i] for i in pending],
                 model_name=self.model,
                 detector_backend=self.detector,
-                distance_metric="cosine",
-                database_type="postgres",
-                connection_details=self._get_db_connection(),
-                search_method="exact",
-                similarity_search=True,  # Return all, apply our threshold later
-                k=limit,
                 enforce_detection=False
-            )
+            ) if pending else []
+            if len(pending) == 1:
+                batch = [batch]  # represent() unwraps single-image batches
+        except Exception:
+            # One bad image fails the whole call; embed the rest one at a time
+            batch = [None] * len(pending)
+
+        computed = {}
+        for i, representations in zip(pending, batch):
+            try:
+                if representations is None:
+                    embedding = self._embed_array(arrays[i])
+                else:
+                    embedding = self._single_face_embedding(representations)
+                self.embedding_cache.put(keys[i], embedding)
+                computed[keys[i]] = results[i] = embedding
+            except Exception as e:
+                results[i] = e
+        if self.reference_store is not None:
+            self.reference_store.put_many(computed)
+        return results
+
+    def _compute_embedding(self, query_image: bytes) -> np.ndarray:
+        """Detect the single face in query_image and run the embedding model."""
+        return self._embed_array(preprocess_to_array(query_image))
+
+    def _embed_array(self, img: np.ndarray) -> np.ndarray:
+        """Embed the single face in a preprocessed BGR image."""
+        # One detector pass: represent() detects and embeds every face, then count them
+        return self._single_face_embedding(DeepFace.represent(
+            img_path=img,
+            model_name=self.model,
+            detector_backend=self.detector,
+            enforce_detection=False
+        ))
 
-            matches = []
-            for df in results:
-                if hasattr(df, 'iterrows'):
-                    for _, row in df.iterrows():
-                        dist = row.get("distance", 1.0)
-                        if dist <= self.threshold:
-                            matches.append(SearchMatch(
-                                image_path=row.get("img_name", ""),
-                                distance=dist,
-                                confidence=max(0, 1 - dist)
-                            ))
+    def _single_face_embedding(self, representations: list[dict]) -> np.ndarray:
+        """Embedding of the only detected face in one image's represent() output."""
+        faces = self._detected(representations, confidence_key="face_confidence")
 
-            return sorted(matches, key=lambda x: x.distance)[:limit]
+        if len(faces) == 0:
+            raise NoFaceDetectedError()
+        if len(faces) > 1:
+            raise MultipleFacesError(len(faces))
+
+        return np.asarray(faces[0]["embedding"], dtype=np.float32)
+
+    def _fetch_embeddings(self) -> list[tuple[str, list[float]]]:
+        """Fetch (img_name, embedding) rows registered with current model/detector."""
+        import psycopg2
 
-        finally:
-            temp_path.unlink(missing_ok=True)
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "SELECT img_name, embedding FROM embeddings "
+                    "WHERE model_name = %s AND detector_backend = %s",
+                    (self.model, self.detector)
+                )
+                return cur.fetchall()
+        except psycopg2.errors.UndefinedTable:
+            return []
+
+    def _gallery_generation(self) -> tuple:
+        """Cheap fingerprint of registered rows: (row count, highest id).
+
+        Any register or clear, from this or another process, changes it.
+        """
+        import psycopg2
+
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "SELECT COUNT(*), MAX(id) FROM embeddings "
+                    "WHERE model_name = %s AND detector_backend = %s",
+                    (self.model, self.detector)
+                )
+                return tuple(cur.fetchone())
+        except psycopg2.errors.UndefinedTable:
+            return (0, None)
+
+    def _sync_gallery(self) -> None:
+        """Drop the gallery and cached results if the embeddings table changed.
+
+        Checks at most once per gallery_check_interval seconds. Caller holds _gallery_lock.
+        """
+        now = time.monotonic()
+        if now - self._gallery_checked_at < self.gallery_check_interval:
+            return
+        generation = self._gallery_generation()
+        self._gallery_checked_at = now
+        if generation != self._gallery_generation_seen:
+            self._gallery = None
+            self.result_cache.clear()
+            self._gallery_generation_seen = generation
+
+    def _get_gallery(self) -> EmbeddingGallery:
+        """Return the in-memory embedding gallery, reloading it from the DB when stale."""
+        with self._gallery_lock:
+            self._sync_gallery()
+            if self._gallery is None:
+                rows = self._fetch_embeddings()
+                self._gallery = EmbeddingGallery(
+                    [row[0] for row in rows], [row[1] for row in rows],
+                    index=self.gallery_index, nprobe=self.gallery_nprobe
+                )
+            return self._gallery
+
+    def invalidate_gallery(self) -> None:
+        """Drop the in-memory gallery and cached results so the next search reloads it."""
+        with self._gallery_lock:
+            self._gallery = None
+            self.result_cache.clear()
+            # Re-read the generation on next use so this change is not seen as another
+            self._gallery_checked_at = float("-inf")
+
+    def search_by_embedding(self, embedding: np.ndarray, limit: int = 10) -> list[SearchMatch]:
+        """Search registered faces by cosine distance to a query embedding."""
+        return self.search_by_embeddings([embedding], limit=limit)[0]
+
+    def search_by_embeddings(
+        self, embeddings: list[np.ndarray], limit: int = 10
+    ) -> list[list[SearchMatch]]:
+        """Search registered faces for several query embeddings in one batched pass.
+
+        Returns:
+            Matches within threshold for each query, closest first
+        """
+        gallery = self._get_gallery()
+        if not len(gallery) or not len(embeddings):
+            return [[] for _ in embeddings]
+
+        names = gallery.names
+        results = []
+        for indices, distances in gallery.top_k_batch(embeddings, limit, max_distance=self.threshold):
+            # Confidence for all rows at once; tolist() yields plain Python numbers
+            confidences = np.maximum(0.0, 1.0 - distances)
+            results.append([
+                SearchMatch(image_path=names[i], distance=dist, confidence=conf)
+                for i, dist, conf in zip(indices.tolist(), distances.tolist(), confidences.tolist())
+            ])
+        return results
+
+    def search(self, query_image: bytes, limit: int = 10) -> list[SearchMatch]:
+        """Search for matching faces of the single face in query_image.
+
+        Repeated queries (same bytes, limit and settings) are answered from
+        result_cache until the gallery changes.
+        """
+        with self._gallery_lock:
+            self._sync_gallery()
+        key = (content_key(query_image), self.model, self.detector, limit, round(self.threshold, 4))
+        matches = self.result_cache.get(key)
+        if matches is None:
+            matches = self.search_by_embedding(self.embed(query_image), limit=limit)
+            self.result_cache.put(key, matches)
+        return list(matches)
 
     def search_with_debug(self, query_image: bytes, limit: int = 10, source_path: str = "") -> list[SearchMatch]:
         """Search with detailed debug output. Delegates to FaceDebugService."""
@@ -176,42 +459,159 @@ class FaceService:
         debug_service = FaceDebugService()
         return debug_service.search_with_debug(query_image, limit, source_path)
 
-    def register_event_photos(self, photos_dir: str | None = None) -> int:
-        """Register all event photos to PostgreSQL using DeepFace.register().
+    def _resolve_photos_dir(self, photos_dir: str | None = None) -> Path:
+        """Resolve the photos dir and make it the base for relative DB paths."""
+        target_path = Path(photos_dir or self.db_path).resolve()
+        self.set_photos_base_dir(str(target_path))
+        return target_path
 
-        Stores relative paths (relative to photos_dir) in the database for portability.
+    def iter_event_photos(self, target_path: Path) -> Iterator[Path]:
+        """Yield image files under target_path (recursive) as the walk finds them.
+
+        Order is deterministic (sorted per directory, depth first), so batches
+        and progress output line up between runs without sorting the whole tree.
         """
-        target_dir = photos_dir or self.db_path
-        target_path = Path(target_dir).resolve()
-        image_extensions = {'.jpg', '.jpeg', '.png', '.heic'}
+        # os.walk gets file names from one getdents per directory instead of a stat per entry
+        for root, dirs, files in os.walk(target_path):
+            dirs.sort()  # In place, so the walk descends in name order
+            for name in sorted(files):
+                if self._image_name.search(name):
+                    yield Path(root, name)
 
-        # Set base dir for future path resolution
-        self.set_photos_base_dir(str(target_path))
+    def list_event_photos(self, photos_dir: str | None = None) -> tuple[Path, list[Path]]:
+        """Resolve photos dir and list image files under it (recursive).
 
-        image_files = [
-            f for f in target_path.rglob("*")
-            if f.is_file() and f.suffix.lower() in image_extensions
-        ]
+        Also sets the base dir used to resolve relative DB paths.
+        """
+        target_path = self._resolve_photos_dir(photos_dir)
+        return target_path, list(self.iter_event_photos(target_path))
 
-        count = 0
-        for img_file in image_files:
+    def register_photo(self, img_file: Path, base_dir: Path) -> bool:
+        """Register one photo, storing its path relative to base_dir.
+
+        Returns:
+            True if registered, False if DeepFace failed on the image
+        """
+        try:
+            full_path = str(img_file.resolve())
+            # Store relative path in DB for portability
+            relative_path = str(img_file.relative_to(base_dir))
+            DeepFace.register(
+                img=full_path,  # Absolute path for file access
+                img_name=relative_path,  # Relative path stored in DB
+                model_name=self.model,
+                detector_backend=self.detector,
+                database_type="postgres",
+                connection_details=self._get_db_connection(),
+                enforce_detection=False
+            )
+            self.invalidate_gallery()
+            return True
+        except Exception as e:
+            print(f"Warning: Failed to register {img_file.name}: {e}")
+            return False
+
+    def register_photo_batch(self, img_files: list[Path], base_dir: Path) -> int:
+        """Register photos with one batched embedding pass and one bulk insert.
+
+        Falls back to per-photo registration if the batch fails, so one
+        unreadable or already registered photo does not drop the rest.
+
+        Returns:
+            Number of photos registered
+        """
+        from deepface.modules.database.postgres import PostgresClient
+
+        if self.register_prefilter:
+            img_files = self._prefilter_faceless(img_files)
+            if not img_files:
+                return 0
+
+        try:
+            results = DeepFace.represent(
+                img_path=[str(f.resolve()) for f in img_files],
+                model_name=self.model,
+                detector_backend=self.detector,
+                enforce_detection=False,
+                return_face=True
+            )
+            if len(img_files) == 1:
+                results = [results]  # represent() unwraps single-image batches
+
+            records = [
+                {
+                    "img_name": str(img_file.relative_to(base_dir)),
+                    "face": face["face"],
+                    "model_name": self.model,
+                    "detector_backend": self.detector,
+                    "embedding": np.ravel(face["embedding"]).tolist(),
+                    "aligned": True,
+                    "l2_normalized": False
+                }
+                for img_file, faces in zip(img_files, results)
+                for face in faces
+            ]
+            client = PostgresClient(connection_details=self._get_db_connection())
             try:
-                full_path = str(img_file.resolve())
-                # Store relative path in DB for portability
-                relative_path = str(img_file.relative_to(target_path))
-                DeepFace.register(
-                    img=full_path,  # Absolute path for file access
-                    img_name=relative_path,  # Relative path stored in DB
-                    model_name=self.model,
-                    detector_backend=self.detector,
-                    database_type="postgres",
-                    connection_details=self._get_db_connection(),
+                # Single executemany + commit, so a duplicate rolls back the whole batch
+                client.insert_embeddings(records, batch_size=len(records))
+            finally:
+                client.close()
+        except Exception as e:
+            print(f"Warning: Batch registration failed ({e}), retrying photo by photo")
+            return sum(self.register_photo(f, base_dir) for f in img_files)
+
+        self.invalidate_gallery()
+        return len(img_files)
+
+    def _prefilter_faceless(self, img_files: list[Path]) -> list[Path]:
+        """Drop photos in which the cheap `register_prefilter` detector finds no face.
+
+        Unreadable photos are kept so the main pass reports them.
+        """
+        kept = []
+        for img_file in img_files:
+            try:
+                faces = DeepFace.extract_faces(
+                    img_path=str(img_file),
+                    detector_backend=self.register_prefilter,
                     enforce_detection=False
                 )
-                count += 1
-            except Exception as e:
-                print(f"Warning: Failed to register {img_file.name}: {e}")
+            except Exception:
+                kept.append(img_file)
+                continue
+            # No-face results come back as one whole-image region with confidence 0
+            if any(face.get("confidence", 0) > 0 for face in faces):
+                kept.append(img_file)
+        return kept
+
+    def batch_photos(self, image_files: Iterable[Path]) -> Iterator[list[Path]]:
+        """Lazily split photos into chunks of `register_batch_size` for batched registration."""
+        size = max(1, self.register_batch_size)
+        it = iter(image_files)
+        while batch := list(islice(it, size)):
+            yield batch
 
+    def register_event_photos(self, photos_dir: str | None = None) -> int:
+        """Register all event photos to PostgreSQL.
+
+        Stores relative paths (relative to photos_dir) in the database for portability.
+        The directory walk streams batches to `register_workers` threads with a
+        bounded number in flight, so memory stays flat on large libraries.
+        """
+        target_path = self._resolve_photos_dir(photos_dir)
+        max_in_flight = self.register_workers * 2
+        count = 0
+        with ThreadPoolExecutor(
+            max_workers=self.register_workers, thread_name_prefix="register"
+        ) as pool:
+            pending = set()
+            for batch in self.batch_photos(self.iter_event_photos(target_path)):
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    count += sum(f.result() for f in done)
+                pending.add(pool.submit(self.register_photo_batch, batch, target_path))
+            count += sum(f.result() for f in pending)
         return count
 
     def build_representations(self, photos_dir: str | None = None) -> int:
@@ -222,25 +622,30 @@ class FaceService:
         """Clear all registered face embeddings from PostgreSQL."""
         import psycopg2
 
-        conn_details = self._get_db_connection()
-        conn = psycopg2.connect(
-            host=conn_details["host"],
-            port=conn_details["port"],
-            user=conn_details["user"],
-            password=conn_details["password"],
-            dbname=conn_details["dbname"]
-        )
         try:
-            with conn.cursor() as cur:
+            with self._connection() as conn, conn.cursor() as cur:
                 cur.execute("SELECT COUNT(*) FROM embeddings")
                 count = cur.fetchone()[0]
                 cur.execute("DELETE FROM embeddings")
                 conn.commit()
+                self.invalidate_gallery()
                 return count
         except psycopg2.errors.UndefinedTable:
             return 0
-        finally:
-            conn.close()
+
+    def _allowed_roots(self) -> tuple[list[str], tuple[str, ...]]:
+        """Configured allowed directories and their real paths as "dir/" prefixes.
+
+        Resolution (an lstat per path component) runs once per loaded config,
+        not on every search; a reloaded config brings a new list and is re-resolved.
+        """
+        allowed_dirs = get_config().get("storage", {}).get("allowed_directories", [])
+        cached = self._allowed_roots_cache
+        if cached is None or cached[0] is not allowed_dirs:
+            # Trailing separator so /photos does not also admit /photos_other
+            cached = (allowed_dirs, tuple(os.path.join(os.path.realpath(d), "") for d in allowed_dirs))
+            self._allowed_roots_cache = cached
+        return cached
 
     def _validate_folder_path(self, folder_path: str) -> Path:
         """Validate folder path against allowed directories.
@@ -248,40 +653,40 @@ class FaceService:
         Raises:
             ValueError: If folder path is not under allowed directories
         """
-        cfg = get_config()
-        allowed_dirs = cfg.get("storage", {}).get("allowed_directories", [])
+        allowed_dirs, allowed_prefixes = self._allowed_roots()
 
-        folder = Path(folder_path).resolve()
-        for allowed in allowed_dirs:
-            allowed_path = Path(allowed).resolve()
-            try:
-                folder.relative_to(allowed_path)
-                return folder
-            except ValueError:
-                continue
+        folder = os.path.realpath(folder_path)
+        if allowed_prefixes and os.path.join(folder, "").startswith(allowed_prefixes):
+            return Path(folder)
 
         raise ValueError(
             f"Folder path not under allowed directories. "
             f"Allowed: {allowed_dirs}"
         )
 
-    def _get_images_from_folder(self, folder_path: str, max_refs: int = 50) -> list[Path]:
+    def _iter_images_from_folder(self, folder_path: str) -> Iterator[os.DirEntry]:
+        """Yield image files directly in folder_path, in directory order."""
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                # DirEntry type comes from the directory listing; no per-file stat
+                if (entry.is_file(follow_symlinks=False)
+                        and self._image_name.search(entry.name)):
+                    yield entry
+
+    def _get_images_from_folder(self, folder_path: str, max_refs: int = 50) -> list[os.DirEntry]:
         """Get image files from folder (direct children only, limited count).
 
         Args:
             folder_path: Path to folder
             max_refs: Maximum number of reference images to return
-        """
-        folder = Path(folder_path)
-        cfg = get_config()
-        formats = cfg.get("files", {}).get("allowed_formats", ["jpeg", "jpg", "png", "heic"])
-        extensions = {f".{fmt.lower()}" for fmt in formats}
 
-        images = [
-            f for f in folder.iterdir()
-            if f.is_file() and not f.is_symlink() and f.suffix.lower() in extensions
-        ]
-        return images[:max_refs]
+        Returns:
+            Directory entries (path-like, with .name and .path), sorted by name;
+            listing stops after max_refs, so only the kept entries are sorted
+        """
+        images = list(islice(self._iter_images_from_folder(folder_path), max(0, max_refs)))
+        images.sort(key=lambda entry: entry.name)
+        return images
 
     def search_person_folder(
         self, folder_path: str, limit: int = 50, max_refs: int = 50
@@ -312,25 +717,48 @@ class FaceService:
         if not images:
             return PersonSearchResult(person_name, [], 0, ["No images found"])
 
-        # Search with each reference, keep best confidence per image_path
+        # Early stop checks run between chunks of references; otherwise one batch
+        search_cfg = get_config().get("person_search", {})
+        early_stop = search_cfg.get("early_stop_confidence")
+        chunk_size = len(images) if early_stop is None else EARLY_STOP_CHUNK
+
         all_matches: dict[str, SearchMatch] = {}
         errors: list[str] = []
-
-        for img_path in images:
+        notes: list[str] = []
+        processed = 0
+
+        workers = search_cfg.get("embed_workers", 4)
+        for start in range(0, len(images), chunk_size):
+            chunk = images[start:start + chunk_size]
+            processed += len(chunk)
+
+            # Embed the chunk in one model pass (cache hits skip it), then
+            # search the gallery with all of its references in one batch
+            embeddings: list[np.ndarray] = []
+            for img_path, outcome in zip(chunk, self.embed_files(chunk, workers)):
+                if isinstance(outcome, NoFaceDetectedError):
+                    errors.append(f"No face: {img_path.name}")
+                elif isinstance(outcome, Exception):
+                    errors.append(f"{img_path.name}: {outcome}")
+                else:
+                    embeddings.append(outcome)
+
+            # Keep best confidence per image_path across references
             try:
-                content = img_path.read_bytes()
-                matches = self.search(content, limit=limit)
-
-                for m in matches:
-                    if m.image_path not in all_matches:
-                        all_matches[m.image_path] = m
-                    elif m.confidence > all_matches[m.image_path].confidence:
-                        all_matches[m.image_path] = m
-
-            except NoFaceDetectedError:
-                errors.append(f"No face: {img_path.name}")
+                for matches in self.search_by_embeddings(embeddings, limit=limit):
+                    for m in matches:
+                        best = all_matches.get(m.image_path)
+                        if best is None or m.confidence > best.confidence:
+                            all_matches[m.image_path] = m
             except Exception as e:
-                errors.append(f"{img_path.name}: {e}")
+                errors.append(f"Search failed: {e}")
+
+            if early_stop is not None:
+                confident = sum(1 for m in all_matches.values() if m.confidence >= early_stop)
+                remaining = len(images) - start - len(chunk)
+                if confident >= limit and remaining:
+                    notes.append(f"Early stop: skipped {remaining} references")
+                    break
 
         # Sort by confidence descending
         sorted_matches = sorted(
@@ -342,72 +770,100 @@ class FaceService:
         return PersonSearchResult(
             person_name=person_name,
             matches=sorted_matches,
-            reference_count=len(images),
-            search_errors=errors
+            reference_count=processed,
+            search_errors=errors,
+            notes=notes
         )
 
-    def _get_unique_filename(self, dest_dir: Path, filename: str) -> Path:
-        """Get unique filename, adding suffix if exists."""
-        dest = dest_dir / filename
-        if not dest.exists():
-            return dest
+    def _get_unique_filename(
+        self, dest_dir: Path, filename: str, reserved: set[str] | None = None
+    ) -> Path:
+        """Get unique filename, adding suffix if it exists or is already reserved."""
+        reserved = reserved if reserved is not None else set()
+
+        def taken(path: Path) -> bool:
+            return path.name in reserved or path.exists()
 
+        dest = dest_dir / filename
         stem = Path(filename).stem
         suffix = Path(filename).suffix
         counter = 1
-        while dest.exists():
+        while taken(dest):
             dest = dest_dir / f"{stem}_{counter}{suffix}"
             counter += 1
+        reserved.add(dest.name)
         return dest
 
     def copy_matches_to_output(self, result: PersonSearchResult) -> OutputSummary:
         """Copy matched images to person-specific output folder.
 
+        Destination names are assigned up front, then files are copied
+        concurrently with in-kernel copies.
+
         Args:
             result: PersonSearchResult from search_person_folder
 
         Returns:
             OutputSummary with copy statistics
         """
-        import shutil
-
         cfg = get_config()
-        output_root = cfg.get("person_search", {}).get(
-            "output_root", "./results/person_matches"
-        )
+        person_cfg = cfg.get("person_search", {})
+        output_root = person_cfg.get("output_root", "./results/person_matches")
 
         person_folder = Path(output_root) / result.person_name
         person_folder.mkdir(parents=True, exist_ok=True)
 
-        copied = 0
         skipped: list[str] = []
+        jobs: list[tuple[str, Path]] = []
+        reserved: set[str] = set()
 
         for match in result.matches:
-            source_path = Path(self.resolve_image_path(match.image_path))
+            # Plain string paths: one stat per match, no Path objects
+            source_path = self.resolve_image_path(match.image_path)
 
-            if not source_path.exists():
+            if not os.path.exists(source_path):
                 skipped.append(f"Missing: {match.image_path}")
                 continue
 
             # Prefix filename with parent folder to preserve source info
             # e.g., MAY_01/DSC07452.jpg → MAY_01_DSC07452.jpg
-            rel_path = Path(match.image_path)
-            if len(rel_path.parts) > 1:
-                prefix = rel_path.parent.name
-                dest_filename = f"{prefix}_{source_path.name}"
-            else:
-                dest_filename = source_path.name
+            prefix = os.path.basename(os.path.dirname(match.image_path))
+            source_name = os.path.basename(source_path)
+            dest_filename = f"{prefix}_{source_name}" if prefix else source_name
+
+            jobs.append((source_path, self._get_unique_filename(person_folder, dest_filename, reserved)))
 
-            dest_path = self._get_unique_filename(person_folder, dest_filename)
+        link = person_cfg.get("link_instead_of_copy", False)
 
+        def copy_one(job: tuple[str, Path]) -> tuple[str | None, bool]:
+            """Return (error, linked) for one match."""
+            source_path, dest_path = job
             try:
-                shutil.copy2(source_path, dest_path)
-                copied += 1
+                if link:
+                    try:
+                        os.link(source_path, dest_path)  # Metadata only, no bytes moved
+                        return None, True
+                    except OSError:
+                        pass  # EXDEV (other filesystem), EPERM, ...: copy instead
+                fast_copy(source_path, dest_path)
+                return None, False
             except Exception as e:
-                skipped.append(f"Copy failed {source_path.name}: {e}")
+                return f"Copy failed {os.path.basename(source_path)}: {e}", False
+
+        # Copies release the GIL in the kernel; default to a typical disk queue depth
+        workers = person_cfg.get("copy_workers") or min(8, (os.cpu_count() or 1) * 2)
+        copied = linked = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for error, was_linked in pool.map(copy_one, jobs):
+                if error is None:
+                    copied += 1
+                    linked += was_linked
+                else:
+                    skipped.append(error)
 
         return OutputSummary(
             copied_count=copied,
             output_path=str(person_folder.resolve()),
-            skipped_files=skipped
+            skipped_files=sorted(skipped),
+            linked_count=linked
         )
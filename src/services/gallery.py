@@ -0,0 +1,139 @@
+"""In-memory gallery of registered face embeddings."""
+import numpy as np
+
+from src.services.similarity import l2_normalize
+
+# Optional faiss index types (factory strings over inner product of unit vectors)
+FAISS_INDEXES = {
+    "sq8": "SQ8",  # 8-bit scalar quantization: 4x smaller than float32
+    "fp16": "SQfp16",  # Half precision: 2x smaller, near-lossless for unit vectors
+    "hnsw": "HNSW32",  # Graph index: ~log(N) search instead of a full scan
+    "ivf": "IVF{nlist},Flat",  # sqrt(N) k-means cells; only nprobe cells scanned per query
+    "ivfpq": "IVF{nlist},PQ{m}x{nbits}",  # IVF cells + product-quantized codes: 64 B/vector at 512-d
+}
+
+# HNSW candidate list size at query time; higher is more accurate, slower
+HNSW_EF_SEARCH = 64
+# IVF cells scanned per query; higher is more accurate, slower
+IVF_NPROBE = 16
+# Bits per PQ code, i.e. 256 centroids per sub-quantizer
+PQ_NBITS = 8
+# faiss k-means wants at least this many training rows per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+def _trainable_kind(kind: str, n: int) -> str:
+    """Downgrade an index kind that cannot be trained on n rows.
+
+    ivfpq needs 39 rows per PQ centroid, otherwise plain IVF; IVF needs
+    39 rows for a single cell, otherwise an exact scan (cheap at that size).
+    """
+    if kind == "ivfpq" and n < MIN_POINTS_PER_CENTROID * 2 ** PQ_NBITS:
+        kind = "ivf"
+    if kind == "ivf" and n < MIN_POINTS_PER_CENTROID:
+        kind = "exact"
+    return kind
+
+
+def _pq_subquantizers(dim: int) -> int:
+    """Up to 64 PQ sub-quantizers that divide dim."""
+    return next(m for m in (64, 32, 16, 8, 4, 2, 1) if dim % m == 0)
+
+
+def _build_faiss_index(matrix: np.ndarray, kind: str, nprobe: int = IVF_NPROBE):
+    """Train and fill a faiss index of the given kind over unit-length rows."""
+    try:
+        import faiss
+    except ImportError as e:
+        raise ValueError(
+            f"Gallery index '{kind}' requires faiss. Install faiss-cpu or use index: exact."
+        ) from e
+
+    # sqrt(N) cells, but no more than the rows can train
+    nlist = max(1, min(int(np.sqrt(len(matrix))), len(matrix) // MIN_POINTS_PER_CENTROID))
+    factory = FAISS_INDEXES[kind].format(
+        nlist=nlist, m=_pq_subquantizers(matrix.shape[1]), nbits=PQ_NBITS
+    )
+    index = faiss.index_factory(matrix.shape[1], factory, faiss.METRIC_INNER_PRODUCT)
+    index.train(matrix)
+    index.add(matrix)
+    if kind == "hnsw":
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif kind in ("ivf", "ivfpq"):
+        index.nprobe = min(nprobe, nlist)
+    return index
+
+
+class EmbeddingGallery:
+    """Registered embeddings stored as one L2-normalized (N, D) float32 matrix.
+
+    Rows align with `names` (image path per face), so a query is a single
+    matrix-vector product instead of a scan over per-photo records. With a
+    faiss index kind, rows live only in the (quantized) index; galleries too
+    small to train that kind fall back to a simpler one (see index_kind).
+    """
+
+    def __init__(self, names: list[str], embeddings, index: str = "exact", nprobe: int = IVF_NPROBE):
+        if index != "exact" and index not in FAISS_INDEXES:
+            raise ValueError(f"Unknown gallery index: {index}")
+
+        self.names = names
+        index = _trainable_kind(index, len(names))
+        self.index_kind = index
+        self._index = None
+        self.matrix = l2_normalize(embeddings) if names else np.empty((0, 0), np.float32)
+        if names and index != "exact":
+            self._index = _build_faiss_index(self.matrix, index, nprobe)
+            self.matrix = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def top_k(self, query, k: int, max_distance: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return (row indices, cosine distances) of the k nearest rows, closest first."""
+        return self.top_k_batch(np.reshape(query, (1, -1)), k, max_distance)[0]
+
+    def top_k_batch(
+        self, queries, k: int, max_distance: float | None = None
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Nearest rows for each query row (R, D), scored in one matrix product.
+
+        Args:
+            queries: Query embeddings, one per row
+            k: Max rows returned per query
+            max_distance: If set, rows farther than this are dropped
+
+        Returns:
+            One (row indices, cosine distances) pair per query, closest first
+        """
+        q = l2_normalize(queries)
+        if self._index is not None:
+            similarities, idx = self._index.search(q, k)
+            found = idx >= 0
+            if max_distance is not None:
+                found &= 1 - similarities <= max_distance
+            return [(i[f], 1 - s[f]) for i, s, f in zip(idx, similarities, found)]
+
+        distances = 1 - q @ self.matrix.T
+        if max_distance is not None:
+            return [self._top_within(row, k, max_distance) for row in distances]
+
+        if k < distances.shape[1]:
+            idx = np.argpartition(distances, k, axis=1)[:, :k]
+        else:
+            idx = np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+        top = np.take_along_axis(distances, idx, axis=1)
+        order = np.argsort(top, axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return list(zip(idx, top))
+
+    @staticmethod
+    def _top_within(row: np.ndarray, k: int, max_distance: float) -> tuple[np.ndarray, np.ndarray]:
+        """k closest entries of one distance row that are within max_distance."""
+        # Usually few rows pass the threshold, so partition only those
+        idx = np.flatnonzero(row <= max_distance)
+        if k < len(idx):
+            idx = idx[np.argpartition(row[idx], k)[:k]]
+        idx = idx[np.argsort(row[idx])]
+        return idx, row[idx]
@@ -0,0 +1,32 @@
+"""Vectorized cosine-distance kernels over float32 embeddings."""
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:  # pragma: no cover - optional speedup
+    simsimd = None
+
+_EPS = 1e-10
+
+
+def as_embeddings(vectors) -> np.ndarray:
+    """Convert embeddings to a C-contiguous float32 array."""
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def cosine_distances(query, gallery) -> np.ndarray:
+    """Cosine distance from one query vector (D,) to every row of gallery (N, D)."""
+    q = as_embeddings(query)
+    g = as_embeddings(gallery)
+    if simsimd is not None:
+        # Runtime-dispatched AVX-512/AVX2/NEON kernels, one C call for all rows
+        return np.asarray(simsimd.cdist(q[None, :], g, metric="cosine"), dtype=np.float32)[0]
+    norms = np.linalg.norm(g, axis=1) * np.linalg.norm(q) + _EPS
+    return 1 - (g @ q) / norms
+
+
+def l2_normalize(vectors) -> np.ndarray:
+    """Scale each row (or a single vector) to unit length as float32."""
+    v = as_embeddings(vectors)
+    norms = np.linalg.norm(v, axis=-1, keepdims=True) + _EPS
+    return as_embeddings(v / norms)
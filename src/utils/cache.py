@@ -0,0 +1,149 @@
+"""Thread-safe in-process caches."""
+import hashlib
+import mmap
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable
+
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional speedup
+    xxhash = None
+
+
+def content_key(data: bytes | mmap.mmap) -> bytes:
+    """128-bit digest of raw content for cache keys (not for security).
+
+    Uses SIMD xxh3 when available, blake2b otherwise.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def file_content_key(path) -> bytes:
+    """content_key of a file, hashed through a read-only mmap instead of a bytes copy."""
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return content_key(data)
+        except ValueError:  # Empty files cannot be mapped
+            return content_key(b"")
+
+
+class TTLCache:
+    """LRU cache with optional per-entry time-to-live and hit/miss stats."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float | None = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value (marking it recently used) or default."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value, evicting least recently used entries over max_size."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries (stats are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit-rate counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class EmbeddingStore:
+    """Embeddings persisted in SQLite, keyed by (content digest, model, detector).
+
+    Outlives the process, unlike TTLCache. The file is opened on first use.
+    Purely a cache: storage errors are treated as misses, never raised.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "digest BLOB, model TEXT, detector TEXT, embedding BLOB, "
+                "PRIMARY KEY (digest, model, detector))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: list[tuple[bytes, str, str]]) -> dict[tuple, np.ndarray]:
+        """Return stored float32 embeddings for the keys that are present."""
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                for key in keys:
+                    row = conn.execute(
+                        "SELECT embedding FROM embeddings WHERE digest = ? AND model = ? AND detector = ?",
+                        key
+                    ).fetchone()
+                    if row is not None:
+                        found[key] = np.frombuffer(row[0], dtype=np.float32)
+        except (sqlite3.Error, OSError):
+            pass
+        return found
+
+    def put_many(self, items: dict[tuple[bytes, str, str], np.ndarray]) -> None:
+        """Store embeddings in one transaction."""
+        if not items:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                        [(*key, np.asarray(emb, dtype=np.float32).tobytes()) for key, emb in items.items()]
+                    )
+        except (sqlite3.Error, OSError):
+            pass
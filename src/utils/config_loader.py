@@ -5,19 +5,28 @@ import yaml
 from pathlib import Path
 import threading
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C parser
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 _config = None
 _config_lock = threading.Lock()
+# Parsed YAML per (path, mtime), so reloading an unchanged file skips parsing
+_raw_cache: dict[tuple[str, int], dict] = {}
+
+_ENV_PATTERN = re.compile(r'\$\{(\w+)(?::-([^}]*))?\}')
+
+
+def _env_replacer(match: re.Match) -> str:
+    """Substitute one ${VAR:-default} match from the environment."""
+    return os.environ.get(match.group(1), match.group(2) or "")
 
 
 def _resolve_env_vars(value):
     """Resolve ${VAR:-default} patterns in config values."""
     if isinstance(value, str):
-        pattern = r'\$\{(\w+)(?::-([^}]*))?\}'
-        def replacer(match):
-            var_name = match.group(1)
-            default = match.group(2) or ""
-            return os.environ.get(var_name, default)
-        return re.sub(pattern, replacer, value)
+        return _ENV_PATTERN.sub(_env_replacer, value)
     elif isinstance(value, dict):
         return {k: _resolve_env_vars(v) for k, v in value.items()}
     elif isinstance(value, list):
@@ -25,14 +34,28 @@ def _resolve_env_vars(value):
     return value
 
 
+def _read_yaml(path: str) -> dict:
+    """Parse the YAML file, reusing the last parse while its mtime is unchanged."""
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    raw = _raw_cache.get(key)
+    if raw is None:
+        with open(path) as f:
+            raw = yaml.load(f, Loader=_YamlLoader)
+        _raw_cache.clear()
+        _raw_cache[key] = raw
+    return raw
+
+
 def load_config(path: str = "config/config.yaml") -> dict:
     """Load configuration from YAML file with thread safety."""
     global _config
+    # Fast path without the lock; _config is assigned once, as a single reference
+    if _config is not None:
+        return _config
     with _config_lock:
         if _config is None:
-            with open(path) as f:
-                raw_config = yaml.safe_load(f)
-            _config = _resolve_env_vars(raw_config)
+            # Env vars are resolved on every load; the resolved tree is a fresh copy
+            _config = _resolve_env_vars(_read_yaml(path))
             # Convert port to int
             if "database" in _config and "port" in _config["database"]:
                 _config["database"]["port"] = int(_config["database"]["port"])
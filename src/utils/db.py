@@ -0,0 +1,48 @@
+"""Shared PostgreSQL connection pools."""
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(conn_details: dict, max_size: int):
+    """Return the pool for these connection details, creating it on first use."""
+    key = tuple(sorted(conn_details.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            from psycopg2.pool import ThreadedConnectionPool
+
+            pool = ThreadedConnectionPool(minconn=1, maxconn=max_size, **conn_details)
+            _pools[key] = pool
+        return pool
+
+
+@contextmanager
+def pooled_connection(conn_details: dict, max_size: int = 8) -> Iterator:
+    """Borrow a psycopg2 connection, returning it to the pool afterwards.
+
+    Any open transaction is rolled back on return, so callers commit
+    explicitly; broken connections are discarded instead of reused.
+    """
+    pool = _get_pool(conn_details, max_size)
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        try:
+            if not conn.closed:
+                conn.rollback()
+        except Exception:
+            conn.close()  # Server went away; don't hand the socket out again
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def close_pools() -> None:
+    """Close every pooled connection (e.g. after fork or at shutdown)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
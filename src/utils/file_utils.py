@@ -0,0 +1,85 @@
+"""File copy utilities."""
+import os
+import shutil
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Fallback copy chunk: 16x shutil's default, ~10 syscalls for a typical photo
+COPY_BUFSIZE = 1 << 20
+# Copy buffers are per thread, since copies run on a thread pool
+_local = threading.local()
+
+# linux/fs.h: _IOW(0x94, 9, int) - share the source's extents (CoW reflink)
+FICLONE = 0x40049409
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    """Clone src into dst on CoW filesystems (Btrfs, XFS); False if unsupported."""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError:  # EXDEV, EOPNOTSUPP, EINVAL, ...: not clonable here
+        return False
+
+
+def _copy_range(src_fd: int, dst_fd: int, size: int) -> None:
+    """Copy size bytes in-kernel: reflink, copy_file_range, else sendfile."""
+    if size and _reflink(src_fd, dst_fd):
+        return
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < size:
+                n = os.copy_file_range(src_fd, dst_fd, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            return
+        except OSError:
+            if copied:
+                raise  # Partial copy; don't mix mechanisms mid-file
+    while copied < size:
+        n = os.sendfile(dst_fd, src_fd, copied, size - copied)
+        if n == 0:
+            break
+        copied += n
+
+
+def _copy_buffered(fsrc, fdst, size: int) -> None:
+    """User-space copy through a reused per-thread 1 MiB buffer."""
+    buf = getattr(_local, "buf", None)
+    if buf is None:
+        buf = _local.buf = bytearray(COPY_BUFSIZE)
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fsrc.fileno(), 0, size, os.POSIX_FADV_SEQUENTIAL)
+    view = memoryview(buf)
+    while n := fsrc.readinto(buf):
+        fdst.write(view[:n])
+
+
+def fast_copy(src: str | Path, dst: str | Path) -> None:
+    """Copy file contents and metadata like shutil.copy2, without a user-space loop.
+
+    Tries a FICLONE reflink (no data moved on Btrfs/XFS), then
+    copy_file_range (server-side copy on NFS 4.2) or sendfile, falling back
+    to a 1 MiB buffered copy elsewhere.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        try:
+            if not hasattr(os, "sendfile"):
+                raise OSError("no in-kernel copy on this platform")
+            _copy_range(fsrc.fileno(), fdst.fileno(), size)
+        except OSError:
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            _copy_buffered(fsrc, fdst, size)
+    shutil.copystat(src, dst)
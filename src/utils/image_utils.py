@@ -1,37 +1,121 @@
 """Image utilities."""
 import io
-import uuid
+import itertools
+import math
+import os
 from pathlib import Path
+import numpy as np
 from PIL import Image
 from pillow_heif import register_heif_opener
 
 register_heif_opener()
 
 
-def preprocess_image(content: bytes, max_dim: int = 1920) -> bytes:
-    """Normalize image: convert to RGB, resize if needed."""
+def _normalize_image(content: bytes, max_dim: int) -> Image.Image:
+    """Decode to RGB, downscaled so the long side is at most max_dim."""
     img = Image.open(io.BytesIO(content))
 
+    if max(img.size) > max_dim:
+        # JPEG shrink-on-load: decode at 1/2, 1/4 or 1/8 scale in the DCT domain
+        # while staying >= the target size; no-op for other formats
+        ratio = max_dim / max(img.size)
+        img.draft("RGB", (math.ceil(img.width * ratio), math.ceil(img.height * ratio)))
+
     if img.mode != "RGB":
         img = img.convert("RGB")
 
     if max(img.size) > max_dim:
         ratio = max_dim / max(img.size)
         img = img.resize((int(img.width * ratio), int(img.height * ratio)))
+    return img
 
+
+def preprocess_image(content: bytes, max_dim: int = 1920) -> bytes:
+    """Normalize image: convert to RGB, resize if needed."""
+    img = _normalize_image(content, max_dim)
     out = io.BytesIO()
     img.save(out, format="JPEG", quality=95)
     return out.getvalue()
 
 
+def preprocess_to_array(content: bytes, max_dim: int = 1920) -> np.ndarray:
+    """Normalize like preprocess_image, straight to a BGR array (no JPEG round-trip)."""
+    rgb = np.asarray(_normalize_image(content, max_dim))
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+
+def image_info(content: bytes) -> tuple[int, int, str]:
+    """Return (width, height, mode) from the image header without decoding pixels."""
+    with Image.open(io.BytesIO(content)) as img:
+        return img.width, img.height, img.mode
+
+
+def decode_image(content: bytes) -> np.ndarray:
+    """Decode image bytes once into a BGR uint8 array, the layout DeepFace expects."""
+    with Image.open(io.BytesIO(content)) as img:
+        rgb = np.asarray(img.convert("RGB"))
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+
+# Temp/debug file names: per-process counter, no entropy read per file
+_name_counter = itertools.count()
+_name_token = os.urandom(4).hex()  # Guards against pid reuse across restarts
+
+
+def unique_name() -> str:
+    """Short name unique across processes sharing a temp dir."""
+    return f"{os.getpid()}_{_name_token}_{next(_name_counter)}"
+
+
 def save_temp(content: bytes, temp_dir: str = "./tmp/uploads") -> Path:
     """Save to temp file, return path."""
     Path(temp_dir).mkdir(parents=True, exist_ok=True)
-    path = Path(temp_dir) / f"{uuid.uuid4()}.jpg"
+    path = Path(temp_dir) / f"{unique_name()}.jpg"
     path.write_bytes(content)
     return path
 
 
+# Debug annotation style (PIL's "green")
+BOX_COLOR = (0, 128, 0)
+BOX_WIDTH = 3
+
+
+def _draw_boxes(img: Image.Image, boxes: list[tuple[dict, str]]) -> Image.Image:
+    """Draw labelled face boxes on an RGB image.
+
+    Box edges are painted with array slices in one buffer pass; ImageDraw
+    is only used for the text labels.
+
+    Args:
+        img: RGB image
+        boxes: (facial_area, label) pairs; facial_area has x, y, w, h
+
+    Returns:
+        New annotated image
+    """
+    from PIL import ImageDraw
+
+    arr = np.array(img)
+    height, width = arr.shape[:2]
+    for area, _ in boxes:
+        x, y, w, h = area.get("x", 0), area.get("y", 0), area.get("w", 0), area.get("h", 0)
+        # Same pixels as draw.rectangle([x, y, x + w, y + h], width=3), clipped to the image
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w + 1, width), min(y + h + 1, height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        arr[y0:min(y + BOX_WIDTH, y1), x0:x1] = BOX_COLOR
+        arr[max(y + h + 1 - BOX_WIDTH, y0):y1, x0:x1] = BOX_COLOR
+        arr[y0:y1, x0:min(x + BOX_WIDTH, x1)] = BOX_COLOR
+        arr[y0:y1, max(x + w + 1 - BOX_WIDTH, x0):x1] = BOX_COLOR
+
+    out = Image.fromarray(arr)
+    draw = ImageDraw.Draw(out)
+    for area, label in boxes:
+        draw.text((area.get("x", 0), area.get("y", 0) - 15), label, fill=BOX_COLOR)
+    return out
+
+
 def save_face_debug_image(content: bytes, faces: list[dict], debug_dir: str = "./tmp/debug") -> Path:
     """Save image with face bounding boxes drawn for debugging.
 
@@ -43,26 +127,18 @@ def save_face_debug_image(content: bytes, faces: list[dict], debug_dir: str = ".
     Returns:
         Path to saved debug image
     """
-    from PIL import ImageDraw
-
     Path(debug_dir).mkdir(parents=True, exist_ok=True)
     img = Image.open(io.BytesIO(content))
     if img.mode != "RGB":
         img = img.convert("RGB")
 
-    draw = ImageDraw.Draw(img)
-    for i, face in enumerate(faces):
-        area = face.get("facial_area", {})
-        x, y, w, h = area.get("x", 0), area.get("y", 0), area.get("w", 0), area.get("h", 0)
-        conf = face.get("confidence", 0)
-
-        # Draw rectangle around face
-        draw.rectangle([x, y, x + w, y + h], outline="green", width=3)
-        # Draw label with face number and confidence
-        label = f"Face {i+1}: {conf:.2%}"
-        draw.text((x, y - 15), label, fill="green")
+    # Label with face number and confidence
+    img = _draw_boxes(img, [
+        (face.get("facial_area", {}), f"Face {i+1}: {face.get('confidence', 0):.2%}")
+        for i, face in enumerate(faces)
+    ])
 
-    path = Path(debug_dir) / f"face_detection_{uuid.uuid4().hex[:8]}.jpg"
+    path = Path(debug_dir) / f"face_detection_{unique_name()}.jpg"
     img.save(path, format="JPEG", quality=95)
     return path
 
@@ -82,26 +158,17 @@ def save_match_debug_image(
     Returns:
         Path to saved debug image
     """
-    from PIL import ImageDraw
-
     Path(debug_dir).mkdir(parents=True, exist_ok=True)
     img = Image.open(image_path)
     if img.mode != "RGB":
         img = img.convert("RGB")
 
-    draw = ImageDraw.Draw(img)
-    for i, face in enumerate(faces):
-        area = face.get("facial_area", {})
-        x, y, w, h = area.get("x", 0), area.get("y", 0), area.get("w", 0), area.get("h", 0)
-
-        # Draw rectangle around face
-        draw.rectangle([x, y, x + w, y + h], outline="green", width=3)
-        # Draw label with match confidence
-        label = f"Match: {match_confidence:.2%}"
-        draw.text((x, y - 15), label, fill="green")
+    # Label with match confidence
+    label = f"Match: {match_confidence:.2%}"
+    img = _draw_boxes(img, [(face.get("facial_area", {}), label) for face in faces])
 
     # Use original filename in debug output
     orig_name = Path(image_path).stem
-    path = Path(debug_dir) / f"match_{orig_name}_{uuid.uuid4().hex[:6]}.jpg"
+    path = Path(debug_dir) / f"match_{orig_name}_{unique_name()}.jpg"
     img.save(path, format="JPEG", quality=95)
     return path
@@ -12,6 +12,16 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def search_service():
+    """Shared API service with empty caches and no DB gallery freshness check."""
+    from unittest.mock import patch
+    from src.api import main
+
+    with patch.object(main.service, "_gallery_generation", return_value=(0, None)):
+        yield main.service
+
+
 def test_health_endpoint(client):
     """Test health check endpoint."""
     response = client.get("/health")
@@ -46,3 +56,144 @@ def test_api_cors_headers(client):
     response = client.options("/health")
     # FastAPI handles CORS at middleware level
     assert response.status_code in [200, 405]
+
+
+def _jpeg_bytes(color: str = "red") -> bytes:
+    img = Image.new("RGB", (10, 10), color=color)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_search_runs_in_worker_pool(client, search_service):
+    """Test search inference is offloaded from the event loop."""
+    import threading
+    import numpy as np
+    from unittest.mock import patch
+    from src.api import main
+
+    threads = []
+
+    def fake_embed(content):
+        threads.append(threading.current_thread().name)
+        return np.zeros(4, dtype=np.float32)
+
+    with patch.object(main.service, "embed", side_effect=fake_embed), \
+            patch.object(main.service, "search_by_embedding", return_value=[]):
+        response = client.post(
+            "/search",
+            files={"file": ("test.jpg", io.BytesIO(_jpeg_bytes()), "image/jpeg")}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+    assert threads[0].startswith("face-worker")
+
+
+def test_search_reuses_cached_result(client, search_service):
+    """Test repeated uploads of the same image embed and search only once."""
+    import numpy as np
+    from unittest.mock import patch
+    from src.api import main
+
+    content = _jpeg_bytes("blue")
+    with patch.object(main.service, "_compute_embedding", return_value=np.zeros(4)) as embed, \
+            patch.object(main.service, "search_by_embedding", return_value=[]) as search:
+        for _ in range(2):
+            client.post("/search", files={"file": ("q.jpg", io.BytesIO(content), "image/jpeg")})
+
+    assert embed.call_count == 1
+    assert search.call_count == 1
+    assert client.get("/stats").json()["result_cache"]["hits"] >= 1
+
+
+def test_validate_path_allows_only_subdirectories(tmp_path):
+    """Test path validation against resolved allowed prefixes."""
+    from src.api.main import resolve_allowed_parts, validate_path
+
+    allowed = resolve_allowed_parts([str(tmp_path / "photos")])
+
+    assert validate_path(str(tmp_path / "photos"), allowed)
+    assert validate_path(str(tmp_path / "photos" / "may01"), allowed)
+    assert not validate_path(str(tmp_path / "photos_other"), allowed)
+    assert not validate_path(str(tmp_path / "photos" / ".." / "secret"), allowed)
+
+
+def test_register_counts_successful_photos(client, tmp_path):
+    """Test /register fans photo batches out and counts successes."""
+    import threading
+    from pathlib import Path
+    from unittest.mock import patch
+    from src.api import main
+
+    photos = [Path(f"p{i}.jpg") for i in range(5)]
+    threads = set()
+
+    def fake_register(batch, base):
+        threads.add(threading.current_thread().name)
+        return len(batch) - 1
+
+    with patch.object(main.service, "register_batch_size", 2), \
+            patch.object(main.service, "list_event_photos", return_value=(tmp_path, photos)), \
+            patch.object(main.service, "register_photo_batch", side_effect=fake_register):
+        response = client.post("/register")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+    # Batches run on their own pool, leaving face-worker threads for /search
+    assert all(name.startswith("register-worker") for name in threads)
+
+
+def test_startup_warms_models():
+    """Test lifespan startup loads models once before serving."""
+    from unittest.mock import patch
+    from src.api import main
+
+    with patch.object(main.service, "warmup") as warmup:
+        with TestClient(main.app) as warmed_client:
+            assert warmed_client.get("/health").status_code == 200
+
+    warmup.assert_called_once()
+
+
+def test_search_returns_match_fields(client, search_service):
+    """Test search serializes service matches into the response."""
+    import numpy as np
+    from unittest.mock import patch
+    from src.api import main
+    from src.services.face_service import SearchMatch
+
+    match = SearchMatch("may01/DSC06359.jpg", 0.25, 0.75)
+    with patch.object(main.service, "embed", return_value=np.zeros(4)), \
+            patch.object(main.service, "search_by_embedding", return_value=[match]):
+        response = client.post(
+            "/search",
+            files={"file": ("q.jpg", io.BytesIO(_jpeg_bytes("green")), "image/jpeg")}
+        )
+
+    data = response.json()
+    assert data["success"] is True
+    assert data["error"] is None
+    assert data["matches"] == [
+        {"image_path": "may01/DSC06359.jpg", "confidence": 0.75, "distance": 0.25}
+    ]
+
+
+def test_large_responses_are_gzipped(client, search_service):
+    """Test large match lists are gzip-compressed on the wire."""
+    import numpy as np
+    from unittest.mock import patch
+    from src.api import main
+    from src.services.face_service import SearchMatch
+
+    matches = [SearchMatch(f"events/2024/photo_{i}.jpg", 0.1, 0.9) for i in range(100)]
+    with patch.object(main.service, "embed", return_value=np.zeros(4)), \
+            patch.object(main.service, "search_by_embedding", return_value=matches):
+        response = client.post(
+            "/search?limit=100",
+            files={"file": ("q.jpg", io.BytesIO(_jpeg_bytes("blue")), "image/jpeg")},
+            headers={"Accept-Encoding": "gzip"}
+        )
+
+    assert response.headers.get("content-encoding") == "gzip"
+    assert len(response.json()["matches"]) == 100
@@ -0,0 +1,75 @@
+"""Tests for in-process caches."""
+from unittest.mock import patch
+
+from src.utils.cache import TTLCache
+
+
+def test_get_put_roundtrip():
+    """Test stored values are returned and counted as hits."""
+    cache = TTLCache(max_size=2)
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used():
+    """Test oldest untouched entry is evicted at capacity."""
+    cache = TTLCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_expires_after_ttl():
+    """Test entries older than ttl are treated as misses."""
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+    with patch("src.utils.cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1)
+    with patch("src.utils.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_content_key_is_stable_128_bit():
+    """Test content keys are deterministic 16-byte digests."""
+    from src.utils.cache import content_key
+
+    assert content_key(b"abc") == content_key(b"abc")
+    assert content_key(b"abc") != content_key(b"abd")
+    assert len(content_key(b"abc")) == 16
+
+
+def test_file_content_key_matches_bytes_key(tmp_path):
+    """Test hashing a mapped file gives the same key as hashing its bytes."""
+    from src.utils.cache import content_key, file_content_key
+
+    photo = tmp_path / "ref.jpg"
+    photo.write_bytes(b"\xff\xd8" + b"x" * 4096)
+    empty = tmp_path / "empty.jpg"
+    empty.write_bytes(b"")
+
+    assert file_content_key(photo) == content_key(photo.read_bytes())
+    assert file_content_key(empty) == content_key(b"")
+
+
+def test_embedding_store_roundtrip(tmp_path):
+    """Test embeddings persist across store instances as float32."""
+    import numpy as np
+    from src.utils.cache import EmbeddingStore
+
+    key = (b"\x01" * 16, "Facenet512", "retinaface")
+    EmbeddingStore(tmp_path / "sub" / "store.sqlite").put_many({key: np.array([0.5, -0.25])})
+
+    found = EmbeddingStore(tmp_path / "sub" / "store.sqlite").get_many([key, (b"x", "m", "d")])
+
+    assert list(found) == [key]
+    assert found[key].dtype == np.float32
+    assert list(found[key]) == [0.5, -0.25]
@@ -48,3 +48,32 @@ def test_build_help(runner):
 
     assert result.exit_code == 0
     assert "db-path" in result.output
+
+
+def test_open_paths_batches_on_macos():
+    """Test macOS opens all matches with a single `open` call."""
+    from unittest.mock import patch
+    from src.cli import commands
+
+    with patch.object(commands, "_OPENER_CMD", "open"), \
+            patch.object(commands.subprocess, "run") as run:
+        commands.open_paths(["/a.jpg", "/b.jpg"])
+
+    run.assert_called_once_with(["open", "/a.jpg", "/b.jpg"], check=False)
+
+
+def test_open_paths_reports_windows_open_failures():
+    """Test a file Windows cannot open is reported and the rest still open."""
+    from unittest.mock import patch
+    from src.cli import commands
+
+    with patch.object(commands, "_OPENER_CMD", None), \
+            patch.object(commands.os, "startfile", create=True,
+                         side_effect=[OSError("No application is associated"), None]) as startfile, \
+            patch.object(commands.click, "echo") as echo:
+        commands.open_paths(["C:/a.jpg", "C:/b.jpg"])
+
+    assert startfile.call_count == 2
+    echo.assert_called_once()
+    assert echo.call_args.kwargs == {"err": True}
+    assert "C:/a.jpg" in echo.call_args.args[0]
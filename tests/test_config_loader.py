@@ -74,3 +74,26 @@ def test_env_var_resolution():
 
     # Cleanup
     del os.environ["DB_HOST"]
+
+
+def test_reload_skips_parsing_unchanged_file(tmp_path):
+    """Test reloading an unchanged file reuses the parse but re-resolves env vars."""
+    from unittest.mock import patch
+    import yaml
+    from src.utils.config_loader import load_config
+
+    path = tmp_path / "config.yaml"
+    path.write_text("api:\n  host: ${API_HOST:-0.0.0.0}\n")
+    reset_config()
+    load_config(str(path))
+
+    reset_config()
+    os.environ["API_HOST"] = "127.0.0.1"
+    try:
+        with patch.object(yaml, "load", side_effect=AssertionError("re-parsed")):
+            config = load_config(str(path))
+    finally:
+        del os.environ["API_HOST"]
+        reset_config()
+
+    assert config["api"]["host"] == "127.0.0.1"
@@ -0,0 +1,42 @@
+"""Tests for the PostgreSQL connection pool helpers."""
+from unittest.mock import MagicMock, patch
+
+
+def test_pooled_connection_reuses_pool_and_returns_connection():
+    """Test one pool per connection config, with connections handed back."""
+    from src.utils import db
+
+    db._pools.clear()
+    details = {"host": "db", "port": 5432}
+    with patch("psycopg2.pool.ThreadedConnectionPool") as pool_cls:
+        pool = pool_cls.return_value
+        conn = MagicMock(closed=0)
+        pool.getconn.return_value = conn
+
+        for _ in range(2):
+            with db.pooled_connection(details) as borrowed:
+                assert borrowed is conn
+
+    pool_cls.assert_called_once_with(minconn=1, maxconn=8, host="db", port=5432)
+    assert conn.rollback.call_count == 2
+    pool.putconn.assert_called_with(conn, close=False)
+    db._pools.clear()
+
+
+def test_broken_connection_is_discarded():
+    """Test a connection that fails rollback is closed, not reused."""
+    from src.utils import db
+
+    db._pools.clear()
+    with patch("psycopg2.pool.ThreadedConnectionPool") as pool_cls:
+        pool = pool_cls.return_value
+        conn = MagicMock(closed=0)
+        conn.rollback.side_effect = Exception("server closed the connection")
+        conn.close.side_effect = lambda: setattr(conn, "closed", 2)
+        pool.getconn.return_value = conn
+
+        with db.pooled_connection({"host": "db"}):
+            pass
+
+    pool.putconn.assert_called_once_with(conn, close=True)
+    db._pools.clear()
@@ -0,0 +1,61 @@
+"""Tests for file utilities."""
+import os
+
+
+def test_fast_copy_preserves_content_and_mtime(tmp_path):
+    """Test fast_copy copies bytes and modification time."""
+    from src.utils.file_utils import fast_copy
+
+    src = tmp_path / "src.jpg"
+    src.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    os.utime(src, (1_600_000_000, 1_600_000_000))
+    dst = tmp_path / "dst.jpg"
+
+    fast_copy(src, dst)
+
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_mtime == src.stat().st_mtime
+
+
+def test_fast_copy_empty_file(tmp_path):
+    """Test fast_copy handles empty files."""
+    from src.utils.file_utils import fast_copy
+
+    src = tmp_path / "empty.jpg"
+    src.write_bytes(b"")
+    dst = tmp_path / "out.jpg"
+
+    fast_copy(src, dst)
+
+    assert dst.read_bytes() == b""
+
+
+def test_fast_copy_falls_back_when_reflink_unsupported(tmp_path):
+    """Test fast_copy still copies when the filesystem cannot clone."""
+    from unittest.mock import patch
+    from src.utils import file_utils
+
+    src = tmp_path / "src.jpg"
+    src.write_bytes(os.urandom(100_000))
+    dst = tmp_path / "dst.jpg"
+
+    with patch.object(file_utils.fcntl, "ioctl", side_effect=OSError(95, "Not supported")) as ioctl:
+        file_utils.fast_copy(src, dst)
+
+    ioctl.assert_called_once()
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_fast_copy_buffered_fallback_copies_large_file(tmp_path):
+    """Test the buffered fallback copies files spanning several buffers."""
+    from unittest.mock import patch
+    from src.utils import file_utils
+
+    src = tmp_path / "src.jpg"
+    src.write_bytes(os.urandom(2 * file_utils.COPY_BUFSIZE + 5))
+    dst = tmp_path / "dst.jpg"
+
+    with patch.object(file_utils, "_copy_range", side_effect=OSError(18, "Cross-device")):
+        file_utils.fast_copy(src, dst)
+
+    assert dst.read_bytes() == src.read_bytes()
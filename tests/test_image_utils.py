@@ -41,6 +41,18 @@ def test_preprocess_image_resize():
     assert max(result_img.size) <= 1920
 
 
+def test_preprocess_image_shrink_on_load_keeps_target_size():
+    """Test JPEG draft decoding still yields exactly max_dim on the long side."""
+    from src.utils.image_utils import preprocess_image
+
+    img = Image.new("RGB", (4000, 3000), color="blue")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+
+    result_img = Image.open(io.BytesIO(preprocess_image(buf.getvalue(), max_dim=960)))
+    assert result_img.size == (960, 720)
+
+
 def test_preprocess_image_rgba_to_rgb():
     """Test converting RGBA to RGB."""
     from src.utils.image_utils import preprocess_image
@@ -79,3 +91,71 @@ def test_save_temp():
         assert path.read_bytes() == content
     finally:
         shutil.rmtree(temp_dir)
+
+
+def test_unique_name_is_distinct_per_call():
+    """Test temp names never repeat within a process and carry the pid."""
+    import os
+    from src.utils.image_utils import unique_name
+
+    names = {unique_name() for _ in range(1000)}
+
+    assert len(names) == 1000
+    assert all(name.startswith(f"{os.getpid()}_") for name in names)
+
+
+def test_image_info_reads_header():
+    """Test image_info reports dimensions and mode."""
+    from src.utils.image_utils import image_info
+
+    img = Image.new("L", (120, 80))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+
+    assert image_info(buf.getvalue()) == (120, 80, "L")
+
+
+def test_decode_image_returns_bgr_array():
+    """Test decode_image yields a BGR uint8 array."""
+    from src.utils.image_utils import decode_image
+
+    img = Image.new("RGB", (4, 3), color=(255, 0, 0))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+
+    arr = decode_image(buf.getvalue())
+
+    assert arr.shape == (3, 4, 3)
+    assert arr.dtype.name == "uint8"
+    assert tuple(arr[0, 0]) == (0, 0, 255)
+
+
+def test_preprocess_to_array_resizes_to_bgr():
+    """Test preprocess_to_array downsizes and returns BGR without re-encoding."""
+    from src.utils.image_utils import preprocess_to_array
+
+    img = Image.new("RGBA", (400, 200), color=(255, 0, 0, 255))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+
+    arr = preprocess_to_array(buf.getvalue(), max_dim=100)
+
+    assert arr.shape == (50, 100, 3)
+    assert tuple(arr[0, 0]) == (0, 0, 255)
+
+
+def test_draw_boxes_matches_pil_rectangle():
+    """Test slice-painted boxes match ImageDraw.rectangle, including clipped edges."""
+    import numpy as np
+    from PIL import ImageDraw
+    from src.utils.image_utils import _draw_boxes
+
+    for area in ({"x": 5, "y": 7, "w": 20, "h": 10}, {"x": -3, "y": -2, "w": 10, "h": 8}):
+        img = Image.new("RGB", (40, 40), color="white")
+        expected = img.copy()
+        x, y, w, h = area["x"], area["y"], area["w"], area["h"]
+        ImageDraw.Draw(expected).rectangle([x, y, x + w, y + h], outline="green", width=3)
+
+        result = _draw_boxes(img, [(area, "")])
+
+        assert np.array_equal(np.asarray(result), np.asarray(expected))
@@ -0,0 +1,382 @@
+"""Unit tests for embedding-based face search."""
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from src.exceptions import MultipleFacesError, NoFaceDetectedError
+from src.services.face_service import FaceService, SearchMatch
+
+
+@pytest.fixture
+def unchanged_table():
+    """Answer the gallery freshness check without a DB: the table never changes."""
+    with patch.object(FaceService, "_gallery_generation", return_value=(1, 1)) as generation:
+        yield generation
+
+
+class TestSearchByEmbedding:
+    """Tests for search_by_embedding method."""
+
+    def test_returns_matches_within_threshold_sorted(self, unchanged_table):
+        """Keeps rows under the distance threshold, closest first."""
+        rows = [
+            ("far.jpg", [0.0, 1.0]),
+            ("near.jpg", [1.0, 0.1]),
+            ("exact.jpg", [2.0, 0.0]),
+        ]
+        service = FaceService()
+        service.threshold = 0.4
+        with patch.object(service, "_fetch_embeddings", return_value=rows):
+            matches = service.search_by_embedding(np.array([1.0, 0.0]), limit=10)
+
+        assert [m.image_path for m in matches] == ["exact.jpg", "near.jpg"]
+        assert matches[0].distance < 1e-6
+        assert matches[0].confidence > 0.99
+
+    def test_respects_limit(self, unchanged_table):
+        """Returns at most limit matches."""
+        rows = [(f"p{i}.jpg", [1.0, 0.0]) for i in range(5)]
+        service = FaceService()
+        with patch.object(service, "_fetch_embeddings", return_value=rows):
+            matches = service.search_by_embedding(np.array([1.0, 0.0]), limit=3)
+
+        assert len(matches) == 3
+
+    def test_empty_database_returns_no_matches(self, unchanged_table):
+        """Returns empty list when nothing is registered."""
+        service = FaceService()
+        with patch.object(service, "_fetch_embeddings", return_value=[]):
+            assert service.search_by_embedding(np.array([1.0, 0.0])) == []
+
+    def test_gallery_loaded_once_until_invalidated(self, unchanged_table):
+        """Reuses the in-memory gallery across searches until invalidated."""
+        rows = [("a.jpg", [1.0, 0.0])]
+        service = FaceService()
+        with patch.object(service, "_fetch_embeddings", return_value=rows) as fetch:
+            service.search_by_embedding(np.array([1.0, 0.0]))
+            service.search_by_embedding(np.array([1.0, 0.0]))
+            assert fetch.call_count == 1
+
+            service.invalidate_gallery()
+            service.search_by_embedding(np.array([1.0, 0.0]))
+            assert fetch.call_count == 2
+
+    def test_gallery_reloaded_when_table_changes_elsewhere(self):
+        """Reloads the gallery when another process registers or clears rows."""
+        service = FaceService()
+        service.gallery_check_interval = 0
+        generations = [(1, 1), (1, 1), (2, 2), (0, None)]
+        rows = [[("a.jpg", [1.0, 0.0])], [("a.jpg", [1.0, 0.0]), ("b.jpg", [1.0, 0.0])], []]
+        with patch.object(service, "_gallery_generation", side_effect=generations), \
+                patch.object(service, "_fetch_embeddings", side_effect=rows) as fetch:
+            assert len(service.search_by_embedding(np.array([1.0, 0.0]))) == 1
+            assert len(service.search_by_embedding(np.array([1.0, 0.0]))) == 1
+            assert len(service.search_by_embedding(np.array([1.0, 0.0]))) == 2
+            assert service.search_by_embedding(np.array([1.0, 0.0])) == []
+
+        assert fetch.call_count == 3
+
+    def test_generation_checked_at_most_once_per_interval(self, unchanged_table):
+        """Skips the generation query within gallery_check_interval."""
+        service = FaceService()
+        service.gallery_check_interval = 3600
+        with patch.object(service, "_fetch_embeddings", return_value=[("a.jpg", [1.0, 0.0])]):
+            for _ in range(3):
+                service.search_by_embedding(np.array([1.0, 0.0]))
+
+        assert unchanged_table.call_count == 1
+
+
+class TestEmbed:
+    """Tests for the query embedding cache."""
+
+    def test_repeated_image_is_embedded_once(self):
+        """Identical image bytes reuse the cached embedding."""
+        service = FaceService()
+        service.embedding_cache.clear()
+        with patch.object(service, "_compute_embedding", return_value=np.ones(2)) as compute:
+            first = service.embed(b"same image")
+            second = service.embed(b"same image")
+            service.embed(b"other image")
+
+        assert first is second
+        assert compute.call_count == 2
+
+    def test_cache_shared_across_services_per_model(self):
+        """Services share cached embeddings only for the same model and detector."""
+        first, second = FaceService(), FaceService()
+        first.embedding_cache.clear()
+        second.model = "ArcFace"
+        with patch.object(FaceService, "_compute_embedding", return_value=np.ones(2)) as compute:
+            first.embed(b"shared image")
+            FaceService().embed(b"shared image")
+            second.embed(b"shared image")
+
+        assert first.embedding_cache is second.embedding_cache
+        assert compute.call_count == 2
+
+
+class TestSearchResultCache:
+    """Tests for the per-service search result cache."""
+
+    def test_repeat_search_cached_until_gallery_changes(self, unchanged_table):
+        """Identical searches reuse results; invalidating the gallery drops them."""
+        service = FaceService()
+        match = SearchMatch("a.jpg", 0.1, 0.9)
+        with patch.object(service, "embed", return_value=np.ones(2)), \
+                patch.object(service, "search_by_embedding", return_value=[match]) as search:
+            assert service.search(b"query", limit=5) == [match]
+            service.search(b"query", limit=5)
+            service.search(b"query", limit=10)
+            service.invalidate_gallery()
+            service.search(b"query", limit=5)
+
+        assert search.call_count == 3
+
+    def test_cached_results_dropped_when_table_changes_elsewhere(self):
+        """A register/clear by another process invalidates cached results."""
+        service = FaceService()
+        service.gallery_check_interval = 0
+        match = SearchMatch("a.jpg", 0.1, 0.9)
+        with patch.object(service, "_gallery_generation", side_effect=[(1, 1), (1, 1), (0, None)]), \
+                patch.object(service, "embed", return_value=np.ones(2)), \
+                patch.object(service, "search_by_embedding", return_value=[match]) as search:
+            for _ in range(3):
+                service.search(b"query", limit=5)
+
+        assert search.call_count == 2
+
+
+class TestComputeEmbedding:
+    """Tests for single-pass face validation and embedding."""
+
+    @staticmethod
+    def _jpeg() -> bytes:
+        import io
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new("RGB", (32, 32)).save(buf, format="JPEG")
+        return buf.getvalue()
+
+    def test_single_face_embedded_with_one_detector_pass(self):
+        """Returns the embedding of the only detected face from one represent call."""
+        reps = [{"embedding": [0.5, 0.5], "face_confidence": 0.99}]
+        service = FaceService()
+        with patch("src.services.face_service.DeepFace.represent", return_value=reps) as represent, \
+                patch("src.services.face_service.DeepFace.extract_faces") as extract:
+            embedding = service._compute_embedding(self._jpeg())
+
+        assert embedding.dtype == np.float32
+        assert list(embedding) == [0.5, 0.5]
+        represent.assert_called_once()
+        extract.assert_not_called()
+
+    def test_whole_image_placeholder_raises_no_face(self):
+        """A zero-confidence whole-image region means no face was found."""
+        reps = [{"embedding": [0.5, 0.5], "face_confidence": 0}]
+        service = FaceService()
+        service.detector = "retinaface"
+        with patch("src.services.face_service.DeepFace.represent", return_value=reps):
+            with pytest.raises(NoFaceDetectedError):
+                service._compute_embedding(self._jpeg())
+
+    def test_multiple_faces_rejected(self):
+        """More than one detected face raises MultipleFacesError."""
+        reps = [{"embedding": [0.5, 0.5], "face_confidence": 0.9}] * 2
+        service = FaceService()
+        service.detector = "retinaface"
+        with patch("src.services.face_service.DeepFace.represent", return_value=reps):
+            with pytest.raises(MultipleFacesError):
+                service._compute_embedding(self._jpeg())
+
+
+class TestEmbedFiles:
+    """Tests for batched reference embedding."""
+
+    def test_misses_embedded_in_one_represent_call(self, tmp_path):
+        """Uncached photos share one represent call; cached ones skip it."""
+        import io
+        from PIL import Image
+
+        paths = []
+        for i, color in enumerate(("red", "green", "blue")):
+            buf = io.BytesIO()
+            Image.new("RGB", (16, 16), color=color).save(buf, format="PNG")
+            paths.append(tmp_path / f"ref{i}.png")
+            paths[-1].write_bytes(buf.getvalue())
+
+        service = FaceService()
+        service.embedding_cache.clear()
+        service.reference_store = None
+        batch = [
+            [{"embedding": [1.0, 0.0], "face_confidence": 0.9}],
+            [],
+            [{"embedding": [0.0, 1.0], "face_confidence": 0.9}],
+        ]
+        with patch("src.services.face_service.DeepFace.represent", return_value=batch) as represent:
+            first = service.embed_files(paths)
+            second = service.embed_files([paths[0], paths[2]])
+
+        represent.assert_called_once()
+        assert len(represent.call_args.kwargs["img_path"]) == 3
+        assert list(first[0]) == [1.0, 0.0]
+        assert isinstance(first[1], NoFaceDetectedError)
+        assert second[0] is first[0] and second[1] is first[2]
+
+    def test_reference_store_survives_a_new_process(self, tmp_path):
+        """Embeddings persisted by one service are reused after the memory cache is gone."""
+        from src.utils.cache import EmbeddingStore
+
+        photo = tmp_path / "ref.jpg"
+        photo.write_bytes(TestComputeEmbedding._jpeg())
+        reps = [{"embedding": [0.6, 0.8], "face_confidence": 0.9}]
+
+        first = FaceService()
+        first.embedding_cache.clear()
+        first.reference_store = EmbeddingStore(tmp_path / "refs.sqlite")
+        with patch("src.services.face_service.DeepFace.represent", return_value=reps):
+            first.embed_files([photo])
+
+        second = FaceService()
+        second.embedding_cache.clear()
+        second.reference_store = EmbeddingStore(tmp_path / "refs.sqlite")
+        with patch("src.services.face_service.DeepFace.represent") as represent:
+            (embedding,) = second.embed_files([photo])
+
+        represent.assert_not_called()
+        assert np.allclose(embedding, [0.6, 0.8])
+
+    def test_missing_file_reported_per_path(self, tmp_path):
+        """Unreadable paths yield their exception without failing the batch."""
+        service = FaceService()
+        result = service.embed_files([tmp_path / "missing.jpg"])
+
+        assert isinstance(result[0], OSError)
+
+
+class TestWarmup:
+    """Tests for model warmup."""
+
+    def test_warmup_builds_models_once(self):
+        """Repeated warmup calls load each model only once."""
+        service = FaceService()
+        with patch("src.services.face_service.DeepFace.build_model") as build:
+            service.warmup()
+            service.warmup()
+
+        assert [c.kwargs["task"] for c in build.call_args_list] == [
+            "facial_recognition", "face_detector"
+        ]
+
+    def test_warmup_skips_detector_when_detection_disabled(self):
+        """No detector model is loaded for detector_backend "skip"."""
+        service = FaceService()
+        service.detector = "skip"
+        with patch("src.services.face_service.DeepFace.build_model") as build:
+            service.warmup()
+
+        assert [c.kwargs["task"] for c in build.call_args_list] == ["facial_recognition"]
+
+
+class TestRegisterEventPhotos:
+    """Tests for batched photo registration."""
+
+    def test_list_event_photos_walks_subfolders(self, tmp_path):
+        """Finds images recursively, filtered by extension case-insensitively."""
+        (tmp_path / "day1").mkdir()
+        (tmp_path / "a.JPG").write_bytes(b"1")
+        (tmp_path / "day1" / "b.png").write_bytes(b"2")
+        (tmp_path / "day1" / "notes.txt").write_bytes(b"3")
+
+        service = FaceService()
+        base, photos = service.list_event_photos(str(tmp_path))
+
+        assert base == tmp_path.resolve()
+        assert sorted(p.name for p in photos) == ["a.JPG", "b.png"]
+
+    def test_iter_event_photos_yields_in_sorted_order(self, tmp_path):
+        """Walk order is sorted per directory, independent of creation order."""
+        for name in ("b", "a"):
+            (tmp_path / name).mkdir()
+            for photo in ("2.jpg", "1.jpg"):
+                (tmp_path / name / photo).write_bytes(b"x")
+        (tmp_path / "z.jpg").write_bytes(b"x")
+
+        service = FaceService()
+        photos = [p.relative_to(tmp_path).as_posix() for p in service.iter_event_photos(tmp_path)]
+
+        assert photos == ["z.jpg", "a/1.jpg", "a/2.jpg", "b/1.jpg", "b/2.jpg"]
+
+    def test_registers_every_photo_in_batches(self, tmp_path):
+        """Splits photos into batches across workers and sums registered counts."""
+        photos = [tmp_path / f"p{i}.jpg" for i in range(5)]
+        service = FaceService()
+        service.register_workers = 3
+        service.register_batch_size = 2
+        with patch.object(service, "iter_event_photos", return_value=iter(photos)), \
+                patch.object(service, "register_photo_batch", side_effect=lambda b, base: len(b)) as reg:
+            count = service.register_event_photos(str(tmp_path))
+
+        assert count == 5
+        assert sorted(len(c.args[0]) for c in reg.call_args_list) == [1, 2, 2]
+
+    def test_many_batches_stream_with_bounded_in_flight(self, tmp_path):
+        """All batches are registered even when more than the in-flight cap."""
+        photos = (tmp_path / f"p{i}.jpg" for i in range(50))
+        service = FaceService()
+        service.register_workers = 2
+        service.register_batch_size = 3
+        with patch.object(service, "iter_event_photos", return_value=photos), \
+                patch.object(service, "register_photo_batch", side_effect=lambda b, base: len(b)) as reg:
+            count = service.register_event_photos(str(tmp_path))
+
+        assert count == 50
+        assert reg.call_count == 17
+
+    def test_batch_embeds_once_and_stores_relative_paths(self, tmp_path):
+        """One represent call per batch; every face inserted under its relative path."""
+        photos = [tmp_path / "a.jpg", tmp_path / "sub" / "b.jpg"]
+        faces = [
+            [{"embedding": [0.1, 0.2], "face": np.zeros((2, 2, 3))}],
+            [{"embedding": [0.3, 0.4], "face": np.zeros((2, 2, 3))}] * 2,
+        ]
+        service = FaceService()
+        with patch("src.services.face_service.DeepFace.represent", return_value=faces) as represent, \
+                patch("deepface.modules.database.postgres.PostgresClient") as client_cls:
+            count = service.register_photo_batch(photos, tmp_path)
+
+        assert count == 2
+        represent.assert_called_once()
+        records = client_cls.return_value.insert_embeddings.call_args.args[0]
+        assert [r["img_name"] for r in records] == ["a.jpg", "sub/b.jpg", "sub/b.jpg"]
+
+    def test_batch_failure_falls_back_to_single_photos(self, tmp_path):
+        """A failing batch is retried photo by photo."""
+        photos = [tmp_path / "a.jpg", tmp_path / "b.jpg"]
+        service = FaceService()
+        with patch("src.services.face_service.DeepFace.represent", side_effect=ValueError("bad image")), \
+                patch.object(service, "register_photo", side_effect=[True, False]) as single:
+            count = service.register_photo_batch(photos, tmp_path)
+
+        assert count == 1
+        assert single.call_count == 2
+
+    def test_prefilter_skips_faceless_photos(self, tmp_path):
+        """Photos the cheap detector finds no face in never reach the main pass."""
+        photos = [tmp_path / "crowd.jpg", tmp_path / "landscape.jpg"]
+        detections = {
+            "crowd.jpg": [{"confidence": 0.8}],
+            "landscape.jpg": [{"confidence": 0}],
+        }
+        faces = [{"embedding": [0.1, 0.2], "face": np.zeros((2, 2, 3))}]
+        service = FaceService()
+        service.register_prefilter = "opencv"
+        with patch("src.services.face_service.DeepFace.extract_faces",
+                   side_effect=lambda img_path, **kw: detections[img_path.rsplit("/", 1)[-1]]), \
+                patch("src.services.face_service.DeepFace.represent", return_value=faces) as represent, \
+                patch("deepface.modules.database.postgres.PostgresClient"):
+            count = service.register_photo_batch(photos, tmp_path)
+
+        assert count == 1
+        assert represent.call_args.kwargs["img_path"] == [str(photos[0].resolve())]
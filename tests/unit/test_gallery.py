@@ -0,0 +1,136 @@
+"""Unit tests for the in-memory embedding gallery."""
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from src.services import gallery as gallery_module
+from src.services.gallery import EmbeddingGallery
+
+
+def _gallery_rows(n: int = 64, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_exact_top_k_sorted_by_distance():
+    """Exact index returns the k closest rows in ascending distance."""
+    rows = _gallery_rows()
+    gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows)
+
+    idx, dist = gallery.top_k(rows[5], 3)
+
+    assert idx[0] == 5
+    assert dist[0] == pytest.approx(0.0, abs=1e-5)
+    assert list(dist) == sorted(dist)
+
+
+def test_unknown_index_rejected():
+    """Unknown index kinds raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown gallery index"):
+        EmbeddingGallery(["a.jpg"], [[1.0, 0.0]], index="bogus")
+
+
+def test_sq8_index_finds_exact_match():
+    """Quantized faiss index still ranks the identical row first."""
+    pytest.importorskip("faiss")
+    rows = _gallery_rows()
+    gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows, index="sq8")
+
+    idx, _ = gallery.top_k(rows[7], 3)
+
+    assert idx[0] == 7
+
+
+def test_hnsw_index_finds_exact_match():
+    """HNSW graph index ranks the identical row first."""
+    pytest.importorskip("faiss")
+    rows = _gallery_rows()
+    gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows, index="hnsw")
+
+    idx, dist = gallery.top_k(rows[11], 3)
+
+    assert idx[0] == 11
+    assert list(dist) == sorted(dist)
+
+
+def test_ivf_index_finds_exact_match():
+    """IVF index with sqrt(N) cells ranks the identical row first."""
+    pytest.importorskip("faiss")
+    rows = _gallery_rows(n=400)
+    gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows, index="ivf")
+
+    idx, dist = gallery.top_k(rows[42], 3)
+
+    assert idx[0] == 42
+    assert dist[0] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_ivfpq_index_finds_exact_match():
+    """IVF-PQ index with compressed codes still ranks the identical row first."""
+    pytest.importorskip("faiss")
+    rows = _gallery_rows(n=700)
+    # 4-bit codes need only 39 * 16 training rows, which keeps the test fast
+    with patch.object(gallery_module, "PQ_NBITS", 4):
+        gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows, index="ivfpq", nprobe=20)
+
+    idx, _ = gallery.top_k(rows[42], 3)
+
+    assert gallery.index_kind == "ivfpq"
+    assert idx[0] == 42
+
+
+@pytest.mark.parametrize("n, kind", [(1, "exact"), (20, "exact"), (400, "ivf")])
+def test_ivfpq_small_gallery_falls_back(n, kind):
+    """Galleries too small to train PQ codes use a simpler index instead of failing."""
+    if kind != "exact":
+        pytest.importorskip("faiss")
+    rows = _gallery_rows(n=n)
+    gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows, index="ivfpq")
+
+    idx, dist = gallery.top_k(rows[0], 3)
+
+    assert gallery.index_kind == kind
+    assert idx[0] == 0
+    assert dist[0] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_top_k_batch_matches_single_queries():
+    """Batched lookup returns the same neighbours as one query at a time."""
+    rows = _gallery_rows()
+    gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows)
+
+    batch = gallery.top_k_batch(rows[[3, 9]], 4)
+
+    for (idx, dist), row in zip(batch, rows[[3, 9]]):
+        single_idx, single_dist = gallery.top_k(row, 4)
+        assert list(idx) == list(single_idx)
+        assert np.allclose(dist, single_dist, atol=1e-5)
+
+
+def test_max_distance_filters_before_top_k():
+    """Rows beyond max_distance are dropped; the rest match the unfiltered top-k."""
+    rows = _gallery_rows()
+    gallery = EmbeddingGallery([f"p{i}.jpg" for i in range(len(rows))], rows)
+    all_idx, all_dist = gallery.top_k(rows[4], len(rows))
+    cutoff = float(all_dist[6])
+
+    idx, dist = gallery.top_k(rows[4], 5, max_distance=cutoff)
+    assert list(idx) == list(all_idx[:5])
+
+    idx, dist = gallery.top_k(rows[4], 50, max_distance=cutoff)
+    assert list(idx) == list(all_idx[:7])
+    assert dist.max() <= cutoff
+
+
+def test_fp16_index_distances_close_to_exact():
+    """Half-precision index stays within fp16 rounding of exact distances."""
+    pytest.importorskip("faiss")
+    rows = _gallery_rows()
+    names = [f"p{i}.jpg" for i in range(len(rows))]
+    exact = EmbeddingGallery(names, rows)
+    fp16 = EmbeddingGallery(names, rows, index="fp16")
+
+    idx, dist = fp16.top_k(rows[2], 5)
+    exact_idx, exact_dist = exact.top_k(rows[2], 5)
+
+    assert idx[0] == exact_idx[0] == 2
+    assert np.allclose(dist, exact_dist, atol=1e-3)
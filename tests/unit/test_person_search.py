@@ -1,4 +1,5 @@
 """Unit tests for person search functionality."""
+import os
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
@@ -20,6 +21,11 @@ def mock_config():
     return _mock
 
 
+def _embed_all(paths, workers):
+    """Stand-in for FaceService.embed_files: every reference yields one face."""
+    return [[1.0, 0.0]] * len(paths)
+
+
 class TestSearchPersonFolder:
     """Tests for search_person_folder method."""
 
@@ -31,7 +37,8 @@ class TestSearchPersonFolder:
 
         service = FaceService()
         with patch('src.services.face_service.get_config', return_value=mock_config(tmp_path)):
-            with patch.object(service, 'search', return_value=[]):
+            with patch.object(service, 'embed_files', side_effect=_embed_all), \
+                    patch.object(service, 'search_by_embeddings', side_effect=lambda e, limit: [[] for _ in e]):
                 result = service.search_person_folder(str(folder))
 
         assert result.person_name == "Nguyen Thanh Phong"
@@ -60,16 +67,10 @@ class TestSearchPersonFolder:
         match_other = SearchMatch("event/photo2.jpg", 0.25, 0.75)
 
         service = FaceService()
-        call_count = [0]
-
-        def mock_search(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                return [match_low, match_other]
-            return [match_high]
-
         with patch('src.services.face_service.get_config', return_value=mock_config(tmp_path)):
-            with patch.object(service, 'search', side_effect=mock_search):
+            with patch.object(service, 'embed_files', side_effect=_embed_all), \
+                    patch.object(service, 'search_by_embeddings',
+                                 return_value=[[match_low, match_other], [match_high]]):
                 result = service.search_person_folder(str(folder))
 
         assert len(result.matches) == 2
@@ -84,20 +85,15 @@ class TestSearchPersonFolder:
         (folder / "bad.jpg").write_bytes(b"bad")
 
         service = FaceService()
-        call_count = [0]
-
-        def mock_search(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                raise NoFaceDetectedError()
-            return [SearchMatch("event/photo.jpg", 0.2, 0.8)]
-
         with patch('src.services.face_service.get_config', return_value=mock_config(tmp_path)):
-            with patch.object(service, 'search', side_effect=mock_search):
+            with patch.object(service, 'embed_files', return_value=[NoFaceDetectedError(), [1.0, 0.0]]), \
+                    patch.object(service, 'search_by_embeddings',
+                                 return_value=[[SearchMatch("event/photo.jpg", 0.2, 0.8)]]) as search:
                 result = service.search_person_folder(str(folder))
 
         assert len(result.matches) == 1
         assert any("No face" in err for err in result.search_errors)
+        assert len(search.call_args.args[0]) == 1
 
     def test_reference_count_matches_image_count(self, tmp_path, mock_config):
         """Reference count reflects number of images in folder."""
@@ -109,11 +105,50 @@ class TestSearchPersonFolder:
 
         service = FaceService()
         with patch('src.services.face_service.get_config', return_value=mock_config(tmp_path)):
-            with patch.object(service, 'search', return_value=[]):
+            with patch.object(service, 'embed_files', side_effect=_embed_all), \
+                    patch.object(service, 'search_by_embeddings', side_effect=lambda e, limit: [[] for _ in e]):
                 result = service.search_person_folder(str(folder))
 
         assert result.reference_count == 3
 
+    def test_early_stop_skips_remaining_references(self, tmp_path, mock_config):
+        """Stops embedding references once limit matches are confident enough."""
+        folder = tmp_path / "Test_Person"
+        folder.mkdir()
+        for i in range(10):
+            (folder / f"ref{i}.jpg").write_bytes(b"x")
+
+        cfg = {**mock_config(tmp_path), "person_search": {"early_stop_confidence": 0.85}}
+        strong = [SearchMatch(f"event/p{i}.jpg", 0.1, 0.9) for i in range(2)]
+        service = FaceService()
+        with patch('src.services.face_service.get_config', return_value=cfg):
+            with patch.object(service, 'embed_files', side_effect=_embed_all) as embed, \
+                    patch.object(service, 'search_by_embeddings', return_value=[strong]):
+                result = service.search_person_folder(str(folder), limit=2)
+
+        assert embed.call_count == 1
+        assert len(embed.call_args.args[0]) == 4
+        assert len(result.matches) == 2
+        assert result.reference_count == 4
+        assert result.notes == ["Early stop: skipped 6 references"]
+        assert result.search_errors == []
+
+    def test_embeds_each_chunk_in_one_batch(self, tmp_path, mock_config):
+        """All references are embedded together and searched in one batch."""
+        folder = tmp_path / "Test_Person"
+        folder.mkdir()
+        for i in range(4):
+            (folder / f"ref{i}.jpg").write_bytes(b"x")
+
+        service = FaceService()
+        with patch('src.services.face_service.get_config', return_value=mock_config(tmp_path)):
+            with patch.object(service, 'embed_files', side_effect=_embed_all) as embed, \
+                    patch.object(service, 'search_by_embeddings', side_effect=lambda e, limit: [[] for _ in e]) as search:
+                service.search_person_folder(str(folder))
+
+        embed.assert_called_once()
+        assert len(search.call_args.args[0]) == 4
+
     def test_rejects_path_outside_allowed_directories(self, tmp_path):
         """Raises ValueError for folder outside allowed directories."""
         folder = tmp_path / "Test_Person"
@@ -162,6 +197,34 @@ class TestCopyMatchesToOutput:
         assert (output_root / "John Doe" / "MAY_01_photo.jpg").exists()
         assert output.copied_count == 1
 
+    def test_hard_links_when_enabled(self, tmp_path):
+        """Links matches to the source inode instead of copying when configured."""
+        output_root = tmp_path / "output"
+        source_dir = tmp_path / "event_photos" / "MAY_01"
+        source_dir.mkdir(parents=True)
+        source_file = source_dir / "photo.jpg"
+        source_file.write_bytes(b"image_data")
+
+        result = PersonSearchResult(
+            person_name="John Doe",
+            matches=[SearchMatch("MAY_01/photo.jpg", 0.2, 0.8)],
+            reference_count=1,
+            search_errors=[]
+        )
+
+        service = FaceService()
+        with patch('src.services.face_service.get_config') as mock_cfg:
+            mock_cfg.return_value = {
+                "person_search": {"output_root": str(output_root), "link_instead_of_copy": True}
+            }
+            service.resolve_image_path = lambda p: str(tmp_path / "event_photos" / p)
+            output = service.copy_matches_to_output(result)
+
+        dest = output_root / "John Doe" / "MAY_01_photo.jpg"
+        assert dest.read_bytes() == b"image_data"
+        assert dest.stat().st_ino == source_file.stat().st_ino
+        assert (output.copied_count, output.linked_count) == (1, 1)
+
     def test_handles_duplicate_filenames_from_different_folders(self, tmp_path):
         """Handles same filename from different source folders."""
         output_root = tmp_path / "output"
@@ -197,6 +260,35 @@ class TestCopyMatchesToOutput:
         assert (person_folder / "MAY_02_DSC07452.jpg").exists()
         assert output.copied_count == 2
 
+    def test_same_name_in_one_run_gets_unique_destinations(self, tmp_path):
+        """Concurrent copies never target the same destination filename."""
+        output_root = tmp_path / "output"
+        for folder in ["a", "b"]:
+            (tmp_path / folder / "day1").mkdir(parents=True)
+            (tmp_path / folder / "day1" / "IMG_1.jpg").write_bytes(folder.encode())
+
+        result = PersonSearchResult(
+            person_name="Test Person",
+            matches=[
+                SearchMatch(str(tmp_path / "a" / "day1" / "IMG_1.jpg"), 0.2, 0.8),
+                SearchMatch(str(tmp_path / "b" / "day1" / "IMG_1.jpg"), 0.25, 0.75),
+            ],
+            reference_count=1,
+            search_errors=[]
+        )
+
+        service = FaceService()
+        with patch('src.services.face_service.get_config') as mock_cfg:
+            mock_cfg.return_value = {
+                "person_search": {"output_root": str(output_root)}
+            }
+            service.resolve_image_path = lambda p: p
+            output = service.copy_matches_to_output(result)
+
+        copies = sorted(p.read_bytes() for p in (output_root / "Test Person").iterdir())
+        assert output.copied_count == 2
+        assert copies == [b"a", b"b"]
+
     def test_skips_missing_source_files(self, tmp_path):
         """Records missing files in skipped list."""
         output_root = tmp_path / "output"
@@ -261,6 +353,7 @@ class TestGetImagesFromFolder:
         assert len(images) == 2
         names = {img.name for img in images}
         assert names == {"photo1.jpg", "photo2.png"}
+        assert {os.path.basename(img.path) for img in images} == names
 
     def test_ignores_subdirectories(self, tmp_path, mock_config):
         """Does not recurse into subdirectories."""
@@ -290,3 +383,58 @@ class TestGetImagesFromFolder:
             images = service._get_images_from_folder(str(folder), max_refs=5)
 
         assert len(images) == 5
+
+    def test_extension_match_is_case_insensitive_and_skips_dotfiles(self, tmp_path, mock_config):
+        """Upper-case extensions match; bare '.jpg' dot-files and 'jpg' suffixes do not."""
+        folder = tmp_path / "images"
+        folder.mkdir()
+        for name in ("A.JPEG", "b.Heic", ".jpg", "notjpg", "c.jpg.txt"):
+            (folder / name).write_bytes(b"x")
+
+        service = FaceService()
+        images = service._get_images_from_folder(str(folder))
+
+        assert [img.name for img in images] == ["A.JPEG", "b.Heic"]
+
+    def test_stops_listing_at_max_refs_and_sorts_kept(self, tmp_path, mock_config):
+        """Stops consuming the listing at max_refs and returns the kept entries by name."""
+        folder = tmp_path / "images"
+        folder.mkdir()
+        for name in ("c.jpg", "a.jpg", "b.jpg"):
+            (folder / name).write_bytes(b"x")
+
+        service = FaceService()
+        listing = iter(sorted(os.scandir(folder), key=lambda e: e.name, reverse=True))
+        with patch.object(service, '_iter_images_from_folder', return_value=listing):
+            images = service._get_images_from_folder(str(folder), max_refs=2)
+
+        assert [img.name for img in images] == ["b.jpg", "c.jpg"]
+        assert next(listing).name == "a.jpg"  # Never pulled from the listing
+
+
+class TestValidateFolderPath:
+    """Tests for allowed-directory validation."""
+
+    def test_allowed_directories_resolved_once_per_config(self, tmp_path, mock_config):
+        """Allowed roots are resolved on first use and reused until the config changes."""
+        service = FaceService()
+        cfg = mock_config(tmp_path)
+        with patch('src.services.face_service.get_config', return_value=cfg):
+            first = service._allowed_roots()
+            assert service._allowed_roots() is first
+
+        with patch('src.services.face_service.get_config', return_value=mock_config(tmp_path)):
+            assert service._allowed_roots() is not first
+
+    def test_prefix_match_requires_directory_boundary(self, tmp_path):
+        """A sibling sharing the allowed name as a prefix is rejected; subfolders pass."""
+        (tmp_path / "refs" / "Jane").mkdir(parents=True)
+        (tmp_path / "refs_other").mkdir()
+
+        service = FaceService()
+        with patch('src.services.face_service.get_config',
+                   return_value={"storage": {"allowed_directories": [str(tmp_path / "refs")]}}):
+            assert service._validate_folder_path(str(tmp_path / "refs" / "Jane")) == (tmp_path / "refs" / "Jane").resolve()
+            assert service._validate_folder_path(str(tmp_path / "refs")) == (tmp_path / "refs").resolve()
+            with pytest.raises(ValueError, match="not under allowed directories"):
+                service._validate_folder_path(str(tmp_path / "refs_other"))
@@ -0,0 +1,52 @@
+"""Unit tests for cosine-distance kernels."""
+import numpy as np
+
+from src.services.similarity import as_embeddings, cosine_distances
+
+
+def test_cosine_distances_matches_definition():
+    """Distances equal 1 - cos(angle) for each gallery row."""
+    gallery = np.array([[1.0, 0.0], [0.0, 2.0], [-3.0, 0.0]])
+    distances = cosine_distances([1.0, 0.0], gallery)
+
+    np.testing.assert_allclose(distances, [0.0, 1.0, 2.0], atol=1e-6)
+
+
+def test_simd_and_numpy_paths_agree():
+    """The optional simsimd kernel matches the NumPy fallback."""
+    from unittest.mock import patch
+    from src.services import similarity
+
+    rng = np.random.default_rng(0)
+    query, gallery = rng.normal(size=512), rng.normal(size=(20, 512))
+
+    fast = similarity.cosine_distances(query, gallery)
+    with patch.object(similarity, "simsimd", None):
+        fallback = similarity.cosine_distances(query, gallery)
+
+    assert fast.dtype == fallback.dtype == np.float32
+    np.testing.assert_allclose(fast, fallback, atol=1e-5)
+
+
+def test_as_embeddings_is_contiguous_float32():
+    """Embeddings are normalized to contiguous float32 storage."""
+    arr = as_embeddings(np.arange(6, dtype=np.float64).reshape(3, 2)[:, ::-1])
+
+    assert arr.dtype == np.float32
+    assert arr.flags["C_CONTIGUOUS"]
+
+
+def test_find_matching_face_picks_closest_face():
+    """Returns the facial area of the face nearest the query embedding."""
+    from unittest.mock import patch
+    from src.services.face_service import find_matching_face_in_image
+
+    reps = [
+        {"embedding": [0.0, 1.0], "facial_area": {"x": 1}},
+        {"embedding": [], "facial_area": {"x": 2}},
+        {"embedding": [1.0, 0.1], "facial_area": {"x": 3}},
+    ]
+    with patch("src.services.face_service.DeepFace.represent", return_value=reps):
+        face = find_matching_face_in_image([1.0, 0.0], "img.jpg", "Facenet512", "retinaface")
+
+    assert face == {"facial_area": {"x": 3}}